@@ -0,0 +1,104 @@
+"""Headless batch tracking: run main.py's detection and tracking over video files and export the tracks.
+
+No windows are opened and nothing waits on waitKey, so each video is processed as fast as
+decoding and background subtraction allow (through the threaded pipeline, blocking instead
+of dropping frames). Every tracked box becomes one record (video, frame, id, x, y, w, h) in
+frame coordinates, and all records are written to a single Parquet or CSV file, picked by
+the output file's extension. With --workers > 1 the videos are spread over a process pool.
+
+Usage:
+    python batch.py highway.mp4 other.mp4 --output tracks.parquet --workers 4
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import pandas as pd
+
+from detector import add_detector_arguments, detector_options
+from main import make_processor
+from pipeline import Pipeline
+from tracker import TRACKERS
+
+COLUMNS = ["video", "frame", "id", "x", "y", "w", "h"]
+FORMATS = {".parquet": "parquet", ".csv": "csv"}
+
+
+def track_video(path, tracker_mode="euclidean", options=None):
+    """Track records of one video, with its frame count and the seconds it took
+
+    options are Detector keyword arguments (ROIs, scale, method).
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise OSError(f"cannot open video: {path}")
+    start = time.perf_counter()
+    records = []
+    frames = 0
+    pipeline = Pipeline(cap, make_processor(tracker_mode, draw=False, **(options or {})), drop_policy="block")
+    for index, (_, _, boxes_ids) in pipeline:
+        frames += 1
+        for x, y, w, h, id in boxes_ids:
+            records.append((path, index, id, x, y, w, h))
+    cap.release()
+    return records, frames, time.perf_counter() - start
+
+
+def write_records(records, output):
+    frame = pd.DataFrame.from_records(records, columns=COLUMNS)
+    frame = frame.astype({column: "int64" for column in COLUMNS[1:]})
+    if FORMATS[os.path.splitext(output)[1].lower()] == "parquet":
+        frame.to_parquet(output, index=False)
+    else:
+        frame.to_csv(output, index=False)
+
+
+def finished(videos, tracker_mode, options, workers):
+    """(video, track_video result or the OSError it raised) for each video as it finishes"""
+    if workers <= 1:
+        for video in videos:
+            try:
+                yield video, track_video(video, tracker_mode, options)
+            except OSError as error:
+                yield video, error
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(track_video, video, tracker_mode, options): video for video in videos}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except OSError as error:
+                yield futures[future], error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track objects in video files without a display and export the tracks")
+    parser.add_argument("videos", nargs="+", help="video files to process")
+    parser.add_argument("--output", default="tracks.parquet", help="output file, .parquet or .csv")
+    parser.add_argument("--tracker", choices=sorted(TRACKERS), default="euclidean", help="tracking method")
+    parser.add_argument("--workers", type=int, default=1, help="videos processed in parallel (processes)")
+    add_detector_arguments(parser)
+    args = parser.parse_args()
+    if os.path.splitext(args.output)[1].lower() not in FORMATS:
+        parser.error("--output must end in .parquet or .csv")
+
+    records = []
+    start = time.perf_counter()
+    for done, (video, result) in enumerate(finished(args.videos, args.tracker, detector_options(args), args.workers), 1):
+        if isinstance(result, OSError):
+            print(f"[{done}/{len(args.videos)}] {video}: skipped ({result})")
+            continue
+        video_records, frames, seconds = result
+        records += video_records
+        print(f"[{done}/{len(args.videos)}] {video}: {frames} frames, {len(video_records)} records, "
+              f"{frames / max(seconds, 1e-9):.1f} frames/s")
+
+    write_records(records, args.output)
+    print(f"{len(records)} track records from {len(args.videos)} videos in "
+          f"{time.perf_counter() - start:.2f}s; wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
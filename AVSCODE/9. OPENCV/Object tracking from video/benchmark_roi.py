@@ -0,0 +1,122 @@
+"""Frame rate versus accuracy of the ROI detector at several downscale factors and blob methods.
+
+By default the frames are a synthetic 1080p road scene (textured background, sensor noise,
+cars driving through the demo's ROI) with known car boxes as ground truth. With --video,
+frames come from a file and the reference boxes are those of the full-resolution "tree"
+detector, as the demo ran before downscaling.
+
+For each scale and method the detector's frames/s is measured (frame generation and the
+reference are not timed) and its boxes are matched one to one with the reference at
+IoU >= 0.5, reporting precision, recall and the mean IoU of the matches. The first frames
+are skipped while the background model settles.
+
+Usage:
+    python benchmark_roi.py --scales 1 0.75 0.5 0.25 --frames 150
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from detector import DEFAULT_ROI, METHODS, Detector
+from tracker import box_iou
+
+
+def synthetic_frames(frames, seed=0):
+    """(frame, ground truth boxes) of cars driving down lanes through the default ROI"""
+    rng = np.random.default_rng(seed)
+    background = cv2.GaussianBlur(rng.integers(40, 120, (1080, 1920, 3), dtype=np.uint8), (15, 15), 0)
+    top, bottom, left, right = DEFAULT_ROI
+    cars = []
+    for lane in range(4):
+        for k in range(3):
+            w, h = int(rng.integers(30, 50)), int(rng.integers(50, 90))
+            x = left + 10 + lane * (right - left - 20) // 4
+            # Cars are textured, as real ones are: a flat patch would soon blend into MOG2's background
+            texture = rng.integers(100, 255, (h, w, 3), dtype=np.uint8)
+            cars.append([x, top - 150 + k * 200 + rng.uniform(0, 60), w, h, rng.uniform(4, 9), texture])
+    for _ in range(frames):
+        frame = cv2.add(background, rng.integers(0, 6, background.shape, dtype=np.uint8))
+        truth = []
+        for car in cars:
+            car[1] += car[4]
+            if car[1] > bottom + 50:
+                car[1] = top - 150
+            x, y, w, h = car[0], int(car[1]), car[2], car[3]
+            frame[max(y, 0): y + h, x: x + w] = car[5][max(-y, 0):]
+            # The part inside the ROI is what the detector can see
+            y0, y1 = max(y, top), min(y + h, bottom)
+            if y1 - y0 > 10:
+                truth.append([x, y0, w, y1 - y0])
+        yield frame, truth
+
+
+def video_frames(path, frames):
+    """(frame, None) for up to `frames` frames of a video file"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise OSError(f"cannot open video: {path}")
+    for _ in range(frames):
+        ret, frame = cap.read()
+        if not ret or frame is None:
+            break
+        yield frame, None
+    cap.release()
+
+
+def match(boxes, reference, threshold=0.5):
+    """IoUs of a greedy one-to-one matching of boxes to reference boxes at IoU >= threshold"""
+    if not len(boxes) or not len(reference):
+        return []
+    iou = box_iou(np.asarray(boxes, dtype=np.float64)[:, None], np.asarray(reference, dtype=np.float64)[None])
+    matched = []
+    used_boxes, used_reference = set(), set()
+    for flat in np.argsort(iou, axis=None)[::-1]:
+        i, j = np.unravel_index(flat, iou.shape)
+        if iou[i, j] < threshold:
+            break
+        if i not in used_boxes and j not in used_reference:
+            matched.append(float(iou[i, j]))
+            used_boxes.add(i)
+            used_reference.add(j)
+    return matched
+
+
+def run(frames, scale, method, warmup):
+    detector = Detector(scale=scale, method=method)
+    reference_detector = Detector()
+    elapsed = 0.0
+    detected = expected = 0
+    ious = []
+    for index, (frame, truth) in enumerate(frames):
+        start = time.perf_counter()
+        boxes, _ = detector.detect(frame)
+        elapsed += time.perf_counter() - start
+        reference = truth if truth is not None else reference_detector.detect(frame)[0]
+        if index >= warmup:
+            detected += len(boxes)
+            expected += len(reference)
+            ious += match(boxes, reference)
+    return index + 1, elapsed, len(ious) / max(detected, 1), len(ious) / max(expected, 1), np.mean(ious or [0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ROI detection speed and accuracy across scales")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.75, 0.5, 0.25], help="downscale factors")
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS), help="blob extraction methods")
+    parser.add_argument("--frames", type=int, default=150, help="frames per run")
+    parser.add_argument("--warmup", type=int, default=30, help="frames left out of the accuracy figures")
+    parser.add_argument("--video", help="use this video, scored against full-resolution 'tree' detections")
+    args = parser.parse_args()
+
+    print(f"{'scale':>6} {'method':<11} {'fps':>8} {'precision':>10} {'recall':>7} {'mean IoU':>9}")
+    for scale in args.scales:
+        for method in args.methods:
+            frames = video_frames(args.video, args.frames) if args.video else synthetic_frames(args.frames)
+            count, elapsed, precision, recall, mean_iou = run(frames, scale, method, args.warmup)
+            print(f"{scale:>6.2f} {method:<11} {count / elapsed:>8.1f} {precision:>10.1%} {recall:>7.1%} {mean_iou:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
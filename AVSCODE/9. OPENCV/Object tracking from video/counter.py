@@ -0,0 +1,191 @@
+"""Vehicle counting on top of tracker output: virtual line crossings and zone entries.
+
+TrafficCounter.update takes a frame's tracker.update output ([x, y, w, h, id] boxes) and
+follows each track's box center:
+
+* a Line counts a crossing when a track moves from one side of the segment to the other
+  through the segment itself: "in" from the left of A -> B to its right as seen on screen,
+  "out" the other way;
+* a Zone (a polygon) counts "in" when a track's center enters it and "out" when it leaves,
+  and reports its peak occupancy.
+
+Counts are aggregated per interval of frames; each finished interval is handed to a sink
+(e.g. one JSON line in a file) and forgotten, so a long-running stream keeps only the
+current interval, running totals and the state of the active tracks. A track is forgotten
+max_age frames after it was last seen, so the work per frame is O(active tracks). Track
+IDs must be stable for counts to be right, which favours the "sort" tracker.
+"""
+import json
+
+INTERVAL_FIELDS = ("in", "out")
+
+
+class Line:
+    """Counting line from a to b, in frame coordinates"""
+
+    def __init__(self, name, a, b):
+        self.name, self.a, self.b = name, tuple(a), tuple(b)
+
+    def side(self, point):
+        """Positive right of a -> b on screen (y grows downwards), negative left of it, 0 on it"""
+        (ax, ay), (bx, by) = self.a, self.b
+        return (bx - ax) * (point[1] - ay) - (by - ay) * (point[0] - ax)
+
+    def crosses(self, p, q):
+        """Whether the move p -> q, whose ends lie on opposite sides, passes through the segment"""
+        def side(u, v, point):
+            return (v[0] - u[0]) * (point[1] - u[1]) - (v[1] - u[1]) * (point[0] - u[0])
+
+        return side(p, q, self.a) * side(p, q, self.b) <= 0
+
+
+class Zone:
+    """Counting zone bounded by a polygon, in frame coordinates"""
+
+    def __init__(self, name, polygon):
+        self.name, self.polygon = name, [tuple(point) for point in polygon]
+
+    def contains(self, point):
+        # Ray casting: count the polygon edges crossed by a ray going right from the point
+        x, y = point
+        inside = False
+        for (x1, y1), (x2, y2) in zip(self.polygon, self.polygon[1:] + self.polygon[:1]):
+            if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+        return inside
+
+
+class TrafficCounter:
+    """Counts line crossings and zone entries per interval of `interval` frames
+
+    Every finished interval is passed to sink(record) as a dict with its first and last
+    frame, the interval's counts, the running totals and each zone's peak occupancy.
+    """
+
+    def __init__(self, lines=(), zones=(), interval=1800, max_age=30, sink=None):
+        names = [item.name for item in list(lines) + list(zones)]
+        if len(set(names)) != len(names):
+            raise ValueError(f"lines and zones need distinct names, got {names}")
+        self.lines = list(lines)
+        self.zones = list(zones)
+        self.interval = interval
+        self.max_age = max_age
+        self.sink = sink
+        # id -> [last frame seen, {line name: (last nonzero side, point)}, {zone name: inside}]
+        self.tracks = {}
+        self.totals = self._empty_counts()
+        self.counts = self._empty_counts()
+        self.occupancy = {zone.name: 0 for zone in self.zones}
+        self.peak = dict(self.occupancy)
+        self.interval_start = None
+        self.last_frame = None
+
+    def update(self, frame, boxes_ids):
+        """Count this frame's moves; returns its events as (frame, id, line or zone name, "in"/"out")"""
+        if self.interval_start is None:
+            self.interval_start = frame
+        while frame >= self.interval_start + self.interval:
+            self._emit(self.interval_start + self.interval - 1)
+        self.last_frame = frame
+
+        events = []
+        for x, y, w, h, id in boxes_ids:
+            point = (x + w / 2, y + h / 2)
+            track = self.tracks.get(id)
+            if track is None:
+                track = self.tracks[id] = [frame, {}, {zone.name: False for zone in self.zones}]
+            track[0] = frame
+
+            for line in self.lines:
+                side = line.side(point)
+                if side == 0:
+                    continue
+                last = track[1].get(line.name)
+                if last is not None and (last[0] > 0) != (side > 0) and line.crosses(last[1], point):
+                    events.append((frame, id, line.name, "in" if side > 0 else "out"))
+                track[1][line.name] = (side, point)
+
+            for zone in self.zones:
+                inside = zone.contains(point)
+                if inside != track[2][zone.name]:
+                    events.append((frame, id, zone.name, "in" if inside else "out"))
+                    self.occupancy[zone.name] += 1 if inside else -1
+                    track[2][zone.name] = inside
+
+        for _, _, name, direction in events:
+            self.counts[name][direction] += 1
+            self.totals[name][direction] += 1
+
+        # Forget tracks that have been gone too long; they no longer occupy any zone
+        for id in [id for id, track in self.tracks.items() if frame - track[0] > self.max_age]:
+            for name, inside in self.tracks.pop(id)[2].items():
+                self.occupancy[name] -= inside
+        for name, occupancy in self.occupancy.items():
+            self.peak[name] = max(self.peak[name], occupancy)
+        return events
+
+    def close(self):
+        """Emit the last, possibly partial interval"""
+        if self.interval_start is not None and self.last_frame >= self.interval_start:
+            self._emit(self.last_frame)
+
+    def _emit(self, end):
+        record = {"start_frame": self.interval_start, "end_frame": end, "counts": self.counts,
+                  "totals": {name: dict(counts) for name, counts in self.totals.items()},
+                  "peak_occupancy": self.peak}
+        if self.sink is not None:
+            self.sink(record)
+        self.interval_start = end + 1
+        self.counts = self._empty_counts()
+        self.peak = dict(self.occupancy)
+
+    def _empty_counts(self):
+        return {item.name: dict.fromkeys(INTERVAL_FIELDS, 0) for item in self.lines + self.zones}
+
+
+def jsonl_sink(out):
+    """A sink writing each interval record to an open text file as one JSON line, flushed at once"""
+    def sink(record):
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+    return sink
+
+
+def parse_points(text, kind, count):
+    """Name and points of a "[name=]x1,y1,x2,y2,..." command line value"""
+    name, _, coordinates = text.rpartition("=")
+    try:
+        values = [float(value) for value in coordinates.split(",")]
+    except ValueError:
+        raise ValueError(f"{kind} must be [name=]x1,y1,x2,y2,... in pixels, got {text!r}") from None
+    if len(values) % 2 or len(values) < 2 * count:
+        raise ValueError(f"{kind} needs at least {count} x,y points, got {text!r}")
+    return name, list(zip(values[::2], values[1::2]))
+
+
+def add_counter_arguments(parser):
+    parser.add_argument("--line", action="append", default=[], metavar="[NAME=]X1,Y1,X2,Y2",
+                        help="count tracks crossing this line (frame pixels); repeat for several")
+    parser.add_argument("--zone", action="append", default=[], metavar="[NAME=]X1,Y1,X2,Y2,X3,Y3,...",
+                        help="count tracks entering and leaving this polygon; repeat for several")
+    parser.add_argument("--interval", type=float, default=60, help="seconds per counting interval")
+    parser.add_argument("--counts", help="append interval counts to this JSONL file (default: print them)")
+
+
+def counter_items(args):
+    """Line and Zone objects from the options added by add_counter_arguments"""
+    lines, zones = [], []
+    for i, text in enumerate(args.line, 1):
+        name, points = parse_points(text, "line", 2)
+        if len(points) != 2:
+            raise ValueError(f"line needs exactly 2 points, got {text!r}")
+        lines.append(Line(name or f"line{i}", *points))
+    for i, text in enumerate(args.zone, 1):
+        name, points = parse_points(text, "zone", 3)
+        zones.append(Zone(name or f"zone{i}", points))
+    # Counts and per-track state are keyed by name
+    names = [item.name for item in lines + zones]
+    for name in names:
+        if names.count(name) > 1:
+            raise ValueError(f"lines and zones need distinct names, {name!r} is used twice")
+    return lines, zones
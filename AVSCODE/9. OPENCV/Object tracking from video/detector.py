@@ -0,0 +1,103 @@
+"""Background-subtraction detector over configurable regions of interest.
+
+Each ROI gets its own MOG2 background model. A ROI can be downscaled before subtraction,
+which cuts the per-pixel work by scale**2, and the boxes found are scaled back to frame
+coordinates. Moving blobs are found in the thresholded mask with one of:
+
+* "tree": findContours(RETR_TREE) plus contourArea, as the demo originally did (holes
+  inside a blob come back as extra contours);
+* "external": findContours(RETR_EXTERNAL), outer contours only;
+* "components": connectedComponentsWithStats, whose stats table already holds every blob's
+  box and pixel area, so the area filter is a single vectorized comparison.
+
+benchmark_roi.py compares frame rate and accuracy across scales and methods.
+"""
+import cv2
+import numpy as np
+
+METHODS = ("tree", "external", "components")
+
+# The demo's region of interest as (top, bottom, left, right)
+DEFAULT_ROI = (340, 720, 500, 800)
+
+
+class Detector:
+    """Boxes [x, y, w, h] in frame coordinates of the objects moving inside any of the ROIs
+
+    rois are (top, bottom, left, right) rectangles; overlapping ROIs detect an object in
+    both. min_area is in full-resolution pixels whatever the scale.
+    """
+
+    def __init__(self, rois=(DEFAULT_ROI,), scale=1.0, method="tree", min_area=100,
+                 history=100, var_threshold=40):
+        if method not in METHODS:
+            raise ValueError(f"unknown detection method: {method!r}")
+        if not 0 < scale <= 1:
+            raise ValueError(f"scale must be in (0, 1], got {scale}")
+        self.rois = [tuple(roi) for roi in rois]
+        self.scale = scale
+        self.method = method
+        self.min_area = min_area
+        # Object detection from Stable camera
+        self.subtractors = [cv2.createBackgroundSubtractorMOG2(history=history, varThreshold=var_threshold)
+                            for _ in self.rois]
+
+    def detect(self, frame):
+        """Detected boxes, and the foreground mask of each ROI (at the detection scale)"""
+        boxes = []
+        masks = []
+        for (top, bottom, left, right), subtractor in zip(self.rois, self.subtractors):
+            roi = frame[top: bottom, left: right]
+            if self.scale != 1:
+                roi = cv2.resize(roi, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+            mask = subtractor.apply(roi)
+            _, mask = cv2.threshold(mask, 254, 255, cv2.THRESH_BINARY)
+            masks.append(mask)
+
+            rects = self._blobs(mask, self.min_area * self.scale ** 2)
+            if self.scale != 1:
+                # Back to full resolution, covering every pixel of the blob, clipped to the ROI
+                x0 = np.floor(rects[:, 0] / self.scale)
+                y0 = np.floor(rects[:, 1] / self.scale)
+                x1 = np.minimum(np.ceil((rects[:, 0] + rects[:, 2]) / self.scale), right - left)
+                y1 = np.minimum(np.ceil((rects[:, 1] + rects[:, 3]) / self.scale), bottom - top)
+                rects = np.stack([x0, y0, x1 - x0, y1 - y0], 1).astype(np.int64)
+            boxes += (rects + np.array([left, top, 0, 0])).tolist()
+        return boxes, masks
+
+    def _blobs(self, mask, min_area):
+        """Boxes [x, y, w, h] in mask coordinates of the blobs larger than min_area"""
+        if self.method == "components":
+            _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+            stats = stats[1:]  # label 0 is the background
+            return stats[stats[:, cv2.CC_STAT_AREA] > min_area, :4].astype(np.int64)
+        retrieval = cv2.RETR_TREE if self.method == "tree" else cv2.RETR_EXTERNAL
+        contours, _ = cv2.findContours(mask, retrieval, cv2.CHAIN_APPROX_SIMPLE)
+        # Calculate area and remove small elements
+        rects = [cv2.boundingRect(cnt) for cnt in contours if cv2.contourArea(cnt) > min_area]
+        return np.array(rects, dtype=np.int64).reshape(-1, 4)
+
+
+def parse_roi(text):
+    """A "top,bottom,left,right" command line value"""
+    try:
+        top, bottom, left, right = (int(value) for value in text.split(","))
+    except ValueError:
+        raise ValueError(f"ROI must be top,bottom,left,right in pixels, got {text!r}") from None
+    if not (0 <= top < bottom and 0 <= left < right):
+        raise ValueError(f"empty or negative ROI: {text!r}")
+    return top, bottom, left, right
+
+
+def add_detector_arguments(parser):
+    parser.add_argument("--roi", action="append", type=parse_roi, metavar="TOP,BOTTOM,LEFT,RIGHT",
+                        help=f"region to detect in; repeat for several (default {','.join(map(str, DEFAULT_ROI))})")
+    parser.add_argument("--scale", type=float, default=1.0, help="downscale ROIs by this factor before detection")
+    parser.add_argument("--method", choices=METHODS, default="tree", help="how blobs are extracted from the mask")
+    parser.add_argument("--min-area", type=float, default=100, help="smallest blob area, in full-resolution pixels")
+
+
+def detector_options(args):
+    """Detector keyword arguments from the options added by add_detector_arguments"""
+    return {"rois": args.roi or [DEFAULT_ROI], "scale": args.scale, "method": args.method,
+            "min_area": args.min_area}
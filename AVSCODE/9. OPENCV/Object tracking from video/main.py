@@ -1,50 +1,114 @@
+import argparse
+import os
+import time
+
 import cv2
+import numpy as np
+from counter import Line, TrafficCounter, add_counter_arguments, counter_items, jsonl_sink
+from detector import Detector, add_detector_arguments, detector_options
+from pipeline import DROP_POLICIES, Pipeline
 from tracker import *
 
-# Create tracker object
-tracker = EuclideanDistTracker()
+# The sample video, expected next to this script
+VIDEO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "highway.mp4")
+
+
+def make_processor(tracker_mode, draw=True, **options):
+    """Per-frame detection and tracking; runs on the pipeline's worker thread
+
+    process(frame) returns the frame, the ROI masks and the tracker output, with boxes in
+    frame coordinates. options go to detector.Detector (ROIs, scale, method).
+    """
+    # Create tracker object: "euclidean" (nearest center) or "sort" (Kalman prediction and
+    # optimal IoU/distance assignment, with IDs kept through short gaps)
+    tracker = TRACKERS[tracker_mode]()
+
+    # Object detection from Stable camera, inside the regions of interest
+    detector = Detector(**options)
+
+    def process(frame):
+        # 1. Object Detection
+        detections, masks = detector.detect(frame)
+
+        # 2. Object Tracking
+        boxes_ids = tracker.update(detections)
+        if draw:
+            for box_id in boxes_ids:
+                x, y, w, h, id = box_id
+                cv2.putText(frame, str(id), (x, y - 15), cv2.FONT_HERSHEY_PLAIN, 2, (255, 0, 0), 2)
+                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 3)
+
+        return frame, masks, boxes_ids
+
+    return process
 
-cap = cv2.VideoCapture(r"C:\Ds & AI ( my work)\AVSCODE\9. OPENCV\Object tracking from video\highway.mp4")
 
-# Object detection from Stable camera
-object_detector = cv2.createBackgroundSubtractorMOG2(history=100, varThreshold=40)
+def draw_counts(frame, counter):
+    """Counting lines and zones with their running totals"""
+    for item in counter.lines + counter.zones:
+        points = [item.a, item.b] if isinstance(item, Line) else item.polygon
+        cv2.polylines(frame, [np.int32(points)], not isinstance(item, Line), (0, 255, 255), 2)
+        totals = counter.totals[item.name]
+        x, y = (int(value) for value in points[0])
+        cv2.putText(frame, f"{item.name} in {totals['in']} out {totals['out']}", (x, y - 10),
+                    cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 255), 2)
 
-while True:
-    ret, frame = cap.read()
-    height, width, _ = frame.shape
 
-    # Extract Region of interest
-    roi = frame[340: 720,500: 800]
+def main():
+    parser = argparse.ArgumentParser(description="Track vehicles in a video with background subtraction")
+    parser.add_argument("--video", default=VIDEO_PATH, help="video file, stream URL or camera index")
+    parser.add_argument("--tracker", choices=sorted(TRACKERS), default="euclidean", help="tracking method")
+    parser.add_argument("--queue-size", type=int, default=4, help="frames buffered between stages")
+    parser.add_argument("--drop-policy", choices=DROP_POLICIES, default="block",
+                        help="what a full queue does: wait, or drop frames (drop_oldest suits live streams)")
+    add_detector_arguments(parser)
+    add_counter_arguments(parser)
+    args = parser.parse_args()
+    try:
+        lines, zones = counter_items(args)
+    except ValueError as error:
+        parser.error(str(error))
 
-    # 1. Object Detection
-    mask = object_detector.apply(roi)
-    _, mask = cv2.threshold(mask, 254, 255, cv2.THRESH_BINARY)
-    contours, _ = cv2.findContours(mask, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-    detections = []
-    for cnt in contours:
-        # Calculate area and remove small elements
-        area = cv2.contourArea(cnt)
-        if area > 100:
-            #cv2.drawContours(roi, [cnt], -1, (0, 255, 0), 2)
-            x, y, w, h = cv2.boundingRect(cnt)
+    cap = cv2.VideoCapture(int(args.video) if args.video.isdigit() else args.video)
+    if not cap.isOpened():
+        parser.error(f"cannot open video: {args.video}")
+    # Show frames at the source's pace instead of a fixed waitKey(30)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    options = detector_options(args)
+    pipeline = Pipeline(cap, make_processor(args.tracker, **options), args.queue_size, args.drop_policy)
 
+    # Counts stream out interval by interval, to a JSONL file or the console
+    counts_file = open(args.counts, "a") if args.counts else None
+    counter = None
+    if lines or zones:
+        counter = TrafficCounter(lines, zones, interval=max(1, round(args.interval * fps)),
+                                 sink=jsonl_sink(counts_file) if counts_file else print)
 
-            detections.append([x, y, w, h])
+    shown_at = None
+    for index, (frame, masks, boxes_ids) in pipeline:
+        if counter is not None:
+            counter.update(index, boxes_ids)
+            draw_counts(frame, counter)
+        for i, ((top, bottom, left, right), mask) in enumerate(zip(options["rois"], masks)):
+            suffix = f" {i + 1}" if len(masks) > 1 else ""
+            cv2.imshow("roi" + suffix, frame[top: bottom, left: right])
+            cv2.imshow("Mask" + suffix, mask)
+        cv2.imshow("Frame", frame)
 
-    # 2. Object Tracking
-    boxes_ids = tracker.update(detections)
-    for box_id in boxes_ids:
-        x, y, w, h, id = box_id
-        cv2.putText(roi, str(id), (x, y - 15), cv2.FONT_HERSHEY_PLAIN, 2, (255, 0, 0), 2)
-        cv2.rectangle(roi, (x, y), (x + w, y + h), (0, 255, 0), 3)
+        now = time.perf_counter()
+        shown_at = now if shown_at is None else max(shown_at + 1 / fps, now - 1 / fps)
+        key = cv2.waitKey(max(1, int((shown_at - now) * 1000)))
+        if key == 27:
+            break
 
-    cv2.imshow("roi", roi)
-    cv2.imshow("Frame", frame)
-    cv2.imshow("Mask", mask)
+    cap.release()
+    cv2.destroyAllWindows()
+    if counter is not None:
+        counter.close()
+    if counts_file is not None:
+        counts_file.close()
+    print(pipeline.report())
 
-    key = cv2.waitKey(30)
-    if key == 27:
-        break
 
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
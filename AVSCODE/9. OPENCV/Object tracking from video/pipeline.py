@@ -0,0 +1,188 @@
+"""Threaded capture -> process -> display pipeline for the object tracking demo.
+
+A decoder thread reads frames into a bounded queue, a worker thread runs the per-frame
+processing (background subtraction, contours, tracking) into a second bounded queue, and
+the caller's thread consumes the results, e.g. to show them (OpenCV windows have to be
+driven from the main thread). The stages overlap: while one frame is shown the next one is
+processed and the one after that decoded, and OpenCV releases the GIL while it decodes and
+filters, so the threads really run in parallel.
+
+When a stage falls behind, its input queue fills up and the drop policy decides what
+happens: "block" waits, so every frame is processed and the source is slowed down;
+"drop_oldest" discards the oldest queued frame, which keeps latency lowest on live streams;
+"drop_newest" discards the incoming frame. Per-stage counters record frames, drops, busy
+time per frame and the latency from the start of capture to the end of each stage.
+"""
+import queue
+import threading
+import time
+
+DROP_POLICIES = ("block", "drop_oldest", "drop_newest")
+STAGES = ("capture", "process", "display")
+
+_DONE = object()  # end of stream marker, never dropped
+
+
+class StageStats:
+    """Frames, drops, busy time and capture-to-output latency of one pipeline stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.frames = 0
+        self.dropped = 0  # frames discarded from this stage's input queue
+        self.busy = 0.0
+        self.max_busy = 0.0
+        self.latency = 0.0
+        self.max_latency = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, busy, latency):
+        with self.lock:
+            self.frames += 1
+            self.busy += busy
+            self.max_busy = max(self.max_busy, busy)
+            self.latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def drop(self):
+        with self.lock:
+            self.dropped += 1
+
+    def __str__(self):
+        frames = max(self.frames, 1)
+        return (f"{self.name:<8} {self.frames:>7} {self.dropped:>7} {1000 * self.busy / frames:>8.2f} "
+                f"{1000 * self.max_busy:>8.2f} {1000 * self.latency / frames:>9.2f} {1000 * self.max_latency:>9.2f}")
+
+
+class FrameQueue:
+    """Bounded queue between two stages that applies a drop policy when it is full"""
+
+    def __init__(self, maxsize, policy, stats, stop_event):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"unknown drop policy: {policy!r}")
+        self.queue = queue.Queue(maxsize)
+        self.policy = policy
+        self.stats = stats
+        self.stop_event = stop_event
+
+    def put(self, item):
+        if self.policy == "block":
+            self._put_blocking(item)
+        elif self.policy == "drop_newest":
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self.stats.drop()
+        else:
+            while True:
+                try:
+                    self.queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.stats.drop()
+                    except queue.Empty:
+                        pass
+
+    def finish(self):
+        """Mark the end of the stream"""
+        self._put_blocking(_DONE)
+
+    def get(self):
+        """The next item, or _DONE at the end of the stream or once the pipeline is stopped"""
+        while True:
+            try:
+                return self.queue.get(timeout=0.1)
+            except queue.Empty:
+                if self.stop_event.is_set():
+                    return _DONE
+
+    def _put_blocking(self, item):
+        while not self.stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+
+class Pipeline:
+    """Runs process(frame) on every frame read from capture on a worker thread
+
+    Iterating over the pipeline starts the threads and yields (frame index, result) pairs
+    in order; whatever the loop body does per result counts as the display stage. Breaking
+    out of the loop or calling stop() shuts the threads down.
+    """
+
+    def __init__(self, capture, process, queue_size=4, drop_policy="block"):
+        self.capture = capture
+        self.process = process
+        self.stop_event = threading.Event()
+        self.stats = {name: StageStats(name) for name in STAGES}
+        self.decoded = FrameQueue(queue_size, drop_policy, self.stats["process"], self.stop_event)
+        self.processed = FrameQueue(queue_size, drop_policy, self.stats["display"], self.stop_event)
+        self.threads = [threading.Thread(target=self._read, name="capture", daemon=True),
+                        threading.Thread(target=self._work, name="process", daemon=True)]
+        self.started = self.finished = None
+
+    def __iter__(self):
+        self.started = time.perf_counter()
+        for thread in self.threads:
+            thread.start()
+        try:
+            while True:
+                item = self.processed.get()
+                if item is _DONE:
+                    return
+                index, captured_at, result = item
+                start = time.perf_counter()
+                yield index, result
+                now = time.perf_counter()
+                self.stats["display"].record(now - start, now - captured_at)
+        finally:
+            self.stop()
+
+    def stop(self):
+        self.stop_event.set()
+        for thread in self.threads:
+            if thread.is_alive() and thread is not threading.current_thread():
+                thread.join()
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    def report(self):
+        """Table of per-stage counters (times in ms) and the overall output frame rate"""
+        lines = [f"{'stage':<8} {'frames':>7} {'dropped':>7} {'busy':>8} {'max':>8} {'latency':>9} {'max':>9}"]
+        lines += [str(self.stats[name]) for name in STAGES]
+        if self.started is not None:
+            elapsed = (self.finished or time.perf_counter()) - self.started
+            lines.append(f"{self.stats['display'].frames / max(elapsed, 1e-9):.1f} frames/s out "
+                         f"over {elapsed:.2f}s")
+        return "\n".join(lines)
+
+    def _read(self):
+        index = 0
+        while not self.stop_event.is_set():
+            start = time.perf_counter()
+            ret, frame = self.capture.read()
+            if not ret or frame is None:
+                break
+            elapsed = time.perf_counter() - start
+            self.stats["capture"].record(elapsed, elapsed)
+            self.decoded.put((index, start, frame))
+            index += 1
+        self.decoded.finish()
+
+    def _work(self):
+        while True:
+            item = self.decoded.get()
+            if item is _DONE or self.stop_event.is_set():
+                break
+            index, captured_at, frame = item
+            start = time.perf_counter()
+            result = self.process(frame)
+            now = time.perf_counter()
+            self.stats["process"].record(now - start, now - captured_at)
+            self.processed.put((index, captured_at, result))
+        self.processed.finish()
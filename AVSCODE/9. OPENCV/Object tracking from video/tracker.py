@@ -1,17 +1,48 @@
 import math
 
+import numpy as np
+
+# Below this many (detection, center) comparisons per frame the plain loop beats the grid
+NAIVE_MAX_PAIRS = 4096
+
 
 class EuclideanDistTracker:
-    def __init__(self):
+    def __init__(self, max_distance=25, method="auto"):
         # Store the center positions of the objects
         self.center_points = {}
         # Keep the count of the IDs
         # each time a new object id detected, the count will increase by one
         self.id_count = 0
+        # A detection belongs to the first stored object whose center is closer than this
+        self.max_distance = max_distance
+        # "naive" compares every detection with every center, "grid" looks centers up in a
+        # spatial hash, "auto" picks the grid once a frame has enough objects to pay off
+        if method not in ("auto", "naive", "grid"):
+            raise ValueError(f"unknown matching method: {method!r}")
+        self.method = method
 
 
     def update(self, objects_rect):
         # Objects boxes and ids
+        objects_rect = list(objects_rect)
+        pairs = len(objects_rect) * (len(self.center_points) + len(objects_rect))
+        if self.method == "naive" or (self.method == "auto" and pairs <= NAIVE_MAX_PAIRS):
+            objects_bbs_ids = self._match_naive(objects_rect)
+        else:
+            objects_bbs_ids = self._match_grid(objects_rect)
+
+        # Clean the dictionary by center points to remove IDS not used anymore
+        new_center_points = {}
+        for obj_bb_id in objects_bbs_ids:
+            _, _, _, _, object_id = obj_bb_id
+            center = self.center_points[object_id]
+            new_center_points[object_id] = center
+
+        # Update dictionary with IDs not used removed
+        self.center_points = new_center_points
+        return objects_bbs_ids
+
+    def _match_naive(self, objects_rect):
         objects_bbs_ids = []
 
         # Get center point of new object
@@ -25,9 +56,8 @@ class EuclideanDistTracker:
             for id, pt in self.center_points.items():
                 dist = math.hypot(cx - pt[0], cy - pt[1])
 
-                if dist < 25:
+                if dist < self.max_distance:
                     self.center_points[id] = (cx, cy)
-                    print(self.center_points)
                     objects_bbs_ids.append([x, y, w, h, id])
                     same_object_detected = True
                     break
@@ -38,16 +68,329 @@ class EuclideanDistTracker:
                 objects_bbs_ids.append([x, y, w, h, self.id_count])
                 self.id_count += 1
 
-        # Clean the dictionary by center points to remove IDS not used anymore
-        new_center_points = {}
-        for obj_bb_id in objects_bbs_ids:
-            _, _, _, _, object_id = obj_bb_id
-            center = self.center_points[object_id]
-            new_center_points[object_id] = center
+        return objects_bbs_ids
+
+    def _match_grid(self, objects_rect):
+        """Same matches as _match_naive, looking centers up in a grid of max_distance cells
+
+        Close pairs are found with NumPy, both between detections and the centers stored
+        before this frame and between the detections themselves. Matching then walks the
+        detections in order as the plain loop does and takes the earliest stored center in
+        range; a center that an earlier detection of this frame moved or created is in range
+        when that detection is.
+        """
+        objects_bbs_ids = []
+        ids = list(self.center_points)
+        rank = {id: i for i, id in enumerate(ids)}  # position in center_points order
+
+        rects = np.asarray(objects_rect, dtype=np.float64).reshape(-1, 4)
+        centers = np.floor_divide(np.stack([2 * rects[:, 0] + rects[:, 2], 2 * rects[:, 1] + rects[:, 3]], 1), 2)
+        points = np.array(list(self.center_points.values()), dtype=np.float64).reshape(-1, 2)
+        stored_starts, stored = self._close_pairs(centers, points)
+        earlier_starts, earlier = self._close_pairs(centers, centers)
+
+        assigned = []  # id given to each detection so far
+        moved = {}  # id -> index of the detection that last moved or created it
+        for i, rect in enumerate(objects_rect):
+            x, y, w, h = rect
+            cx = (x + x + w) // 2
+            cy = (y + y + h) // 2
+
+            best = None
+            for j in range(stored_starts[i], stored_starts[i + 1]):
+                if ids[stored[j]] not in moved:
+                    best = ids[stored[j]]
+                    break
+            for j in range(earlier_starts[i], earlier_starts[i + 1]):
+                k = earlier[j]
+                if k >= i:
+                    break
+                id = assigned[k]
+                if moved[id] == k and (best is None or rank[id] < rank[best]):
+                    best = id
+
+            if best is None:
+                # New object is detected we assign the ID to that object
+                best = self.id_count
+                rank[best] = len(rank)
+                self.id_count += 1
+            moved[best] = i
+            assigned.append(best)
+            self.center_points[best] = (cx, cy)
+            objects_bbs_ids.append([x, y, w, h, best])
 
-        # Update dictionary with IDs not used removed
-        self.center_points = new_center_points.copy()
         return objects_bbs_ids
 
+    def _close_pairs(self, queries, points):
+        """For each query, the indices of the points closer than max_distance, in ascending order
+
+        Returns (starts, indices) as lists: query i's points are indices[starts[i]:starts[i + 1]].
+        """
+        query, point = close_pairs(queries, points, self.max_distance)
+        starts = np.concatenate([[0], np.cumsum(np.bincount(query, minlength=len(queries)))])
+        return starts.tolist(), point.tolist()
+
+
+def close_pairs(queries, points, radius):
+    """Index arrays (query, point) of all pairs closer than radius, sorted by query then point
+
+    Points closer than radius sit in the query's cell of a grid of radius-sized cells or in
+    one of its 8 neighbours, so only those are compared.
+    """
+    point_keys = _cell_keys(points, radius)
+    order = np.argsort(point_keys, kind="stable")
+    sorted_keys = point_keys[order]
+
+    neighbours = np.array([dx * 2 ** 32 + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1)], dtype=np.int64)
+    wanted = (_cell_keys(queries, radius)[None, :] + neighbours[:, None]).ravel()
+    lo = np.searchsorted(sorted_keys, wanted, "left")
+    counts = np.searchsorted(sorted_keys, wanted, "right") - lo
+    query = np.repeat(np.tile(np.arange(len(queries)), len(neighbours)), counts)
+    first = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+    point = order[first + np.arange(counts.sum())]
+
+    close = ((queries[query] - points[point]) ** 2).sum(1) < radius ** 2
+    query, point = query[close], point[close]
+    by_query = np.lexsort((point, query))
+    return query[by_query], point[by_query]
+
+
+def _cell_keys(points, cell):
+    """One int64 per grid cell, such that neighbouring cells differ by dx * 2**32 + dy"""
+    cells = np.floor(np.asarray(points, dtype=np.float64).reshape(-1, 2) / cell).astype(np.int64)
+    return cells[:, 0] * 2 ** 32 + cells[:, 1]
+
+
+def linear_assignment(cost):
+    """Minimum-cost assignment (Hungarian method with potentials) for a rows x cols cost matrix
+
+    Returns (rows, cols) index arrays pairing min(rows, cols) rows and columns.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    row_of = np.zeros(m + 1, dtype=np.int64)  # 1-based row matched to each column, 0 if none
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        # Grow a shortest augmenting path from row i, all free columns relaxed at once
+        row_of[0] = i
+        j0 = 0
+        min_to = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = row_of[j0]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = ~used[1:] & (reduced < min_to[1:])
+            min_to[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(used[1:], np.inf, min_to[1:])
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[row_of[used]] += delta
+            v[used] -= delta
+            min_to[~used] -= delta
+            j0 = j1
+            if row_of[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            row_of[j0] = row_of[j1]
+            j0 = j1
+    cols = np.flatnonzero(row_of[1:])
+    rows = row_of[1:][cols] - 1
+    order = np.argsort(rows)
+    rows, cols = rows[order], cols[order]
+    return (cols, rows) if transposed else (rows, cols)
+
+
+def box_iou(a, b):
+    """Intersection over union of (x, y, w, h) boxes in the last axis, broadcasting the rest"""
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    overlap_w = np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    overlap_h = np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    intersection = np.clip(overlap_w, 0, None) * np.clip(overlap_h, 0, None)
+    union = a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
+
+
+class SortTracker:
+    """Tracks boxes with Kalman-predicted positions and optimal assignment, in the style of SORT
+
+    Every frame, each active track's box is predicted with a constant-velocity Kalman filter
+    and detections are assigned to tracks by minimum total cost: 1 - IoU for boxes that
+    overlap by at least iou_threshold, otherwise 1 + center distance / max_distance for
+    centers closer than max_distance; other pairs can't match. A new track is tentative until
+    it has been matched in min_hits frames and is dropped if it misses one before then; only
+    then it is confirmed and gets an ID. A confirmed track survives max_age frames without a
+    match. update() takes and returns boxes in the same format as EuclideanDistTracker.
+
+    All per-track state lives in arrays over the active tracks, so a frame costs O(active
+    tracks) however many IDs were handed out before.
+    """
+
+    # Noise of the position and velocity, relative to the box size
+    STD_POSITION = 1 / 20
+    STD_VELOCITY = 1 / 160
+
+    def __init__(self, max_age=5, min_hits=3, iou_threshold=0.3, max_distance=50):
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance
+        # Kalman state (cx, cy, w, h and their velocities) and covariance of each active track
+        self.mean = np.zeros((0, 8))
+        self.covariance = np.zeros((0, 8, 8))
+        self.ids = np.zeros(0, dtype=np.int64)  # -1 while tentative
+        self.hits = np.zeros(0, dtype=np.int64)
+        self.misses = np.zeros(0, dtype=np.int64)  # frames since the last match
+        self.id_count = 0
+        self.transition = np.eye(8)
+        self.transition[:4, 4:] = np.eye(4)
+
+    def update(self, objects_rect):
+        objects_rect = list(objects_rect)
+        boxes = np.asarray(objects_rect, dtype=np.float64).reshape(-1, 4)
+        self.predict()
+        tracks, detections = self.match(boxes)
+
+        self.correct(tracks, boxes[detections])
+        self.hits[tracks] += 1
+        self.misses += 1
+        self.misses[tracks] = 0
+
+        # Tentative tracks die on their first miss, confirmed ones after max_age
+        confirmed = self.ids >= 0
+        keep = np.where(confirmed, self.misses <= self.max_age, self.misses == 0)
+        matched_to = np.full(len(self.ids), -1, dtype=np.int64)
+        matched_to[tracks] = detections
+        self.compress(keep)
+        matched_to = matched_to[keep]
+
+        new = np.setdiff1d(np.arange(len(boxes)), detections)
+        self.initiate(boxes[new])
+        matched_to = np.concatenate([matched_to, new])
+
+        promote = (self.ids < 0) & (self.hits >= self.min_hits)
+        self.ids[promote] = np.arange(self.id_count, self.id_count + promote.sum())
+        self.id_count += int(promote.sum())
+
+        # Confirmed tracks seen this frame, reported with their detection's box, in detection order
+        shown = np.flatnonzero((self.ids >= 0) & (self.misses == 0))
+        shown = shown[np.argsort(matched_to[shown])]
+        return [[*objects_rect[matched_to[t]], int(self.ids[t])] for t in shown]
+
+    @property
+    def boxes(self):
+        """Current (x, y, w, h) estimate of every active track"""
+        cx, cy, w, h = self.mean[:, :4].T
+        return np.stack([cx - w / 2, cy - h / 2, w, h], 1)
+
+    def predict(self):
+        scale = np.tile(self.mean[:, 2:4], 2)  # w, h, w, h
+        noise = np.concatenate([self.STD_POSITION * scale, self.STD_VELOCITY * scale], 1) ** 2
+        self.mean = self.mean @ self.transition.T
+        self.covariance = self.transition @ self.covariance @ self.transition.T
+        self.covariance[:, range(8), range(8)] += noise
+
+    def correct(self, tracks, boxes):
+        if not len(tracks):
+            return
+        mean, covariance = self.mean[tracks], self.covariance[tracks]
+        measured = np.concatenate([boxes[:, :2] + boxes[:, 2:] / 2, boxes[:, 2:]], 1)
+        innovation_cov = covariance[:, :4, :4].copy()
+        innovation_cov[:, range(4), range(4)] += (self.STD_POSITION * np.tile(mean[:, 2:4], 2)) ** 2
+        gain = np.linalg.solve(innovation_cov, covariance[:, :4, :]).transpose(0, 2, 1)
+        self.mean[tracks] = mean + np.einsum("tij,tj->ti", gain, measured - mean[:, :4])
+        self.covariance[tracks] = covariance - gain @ innovation_cov @ gain.transpose(0, 2, 1)
+
+    def initiate(self, boxes):
+        scale = np.tile(boxes[:, 2:], 2)
+        mean = np.zeros((len(boxes), 8))
+        mean[:, :2] = boxes[:, :2] + boxes[:, 2:] / 2
+        mean[:, 2:4] = boxes[:, 2:]
+        std = np.concatenate([2 * self.STD_POSITION * scale, 10 * self.STD_VELOCITY * scale], 1)
+        covariance = np.zeros((len(boxes), 8, 8))
+        covariance[:, range(8), range(8)] = std ** 2
+        self.mean = np.concatenate([self.mean, mean])
+        self.covariance = np.concatenate([self.covariance, covariance])
+        self.ids = np.concatenate([self.ids, np.full(len(boxes), -1, dtype=np.int64)])
+        self.hits = np.concatenate([self.hits, np.ones(len(boxes), dtype=np.int64)])
+        self.misses = np.concatenate([self.misses, np.zeros(len(boxes), dtype=np.int64)])
+
+    def compress(self, keep):
+        self.mean, self.covariance = self.mean[keep], self.covariance[keep]
+        self.ids, self.hits, self.misses = self.ids[keep], self.hits[keep], self.misses[keep]
+
+    def match(self, boxes):
+        """(track indices, detection indices) of the minimum-cost assignment
+
+        Only pairs close enough to overlap or to be within max_distance are scored. Pairs that
+        can't match split the problem into small independent groups (cars far apart never
+        compete), and each group is solved on its own.
+        """
+        predicted = self.boxes
+        if not len(predicted) or not len(boxes):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        track_centers = predicted[:, :2] + predicted[:, 2:] / 2
+        detection_centers = boxes[:, :2] + boxes[:, 2:] / 2
+        # Overlapping boxes have centers closer than the sum of the largest width and height
+        reach = max(self.max_distance, (predicted[:, 2] + predicted[:, 3]).max(), (boxes[:, 2] + boxes[:, 3]).max())
+        tracks, detections = close_pairs(track_centers, detection_centers, reach)
+
+        iou = box_iou(predicted[tracks], boxes[detections])
+        distance = np.hypot(*(track_centers[tracks] - detection_centers[detections]).T)
+        cost = np.where(iou >= self.iou_threshold, 1 - iou,
+                        np.where(distance < self.max_distance, 1 + distance / self.max_distance, np.inf))
+        feasible = np.isfinite(cost)
+        tracks, detections, cost = tracks[feasible].tolist(), detections[feasible].tolist(), cost[feasible].tolist()
+
+        # Connected groups of tracks and detections through feasible pairs
+        offset = len(predicted)
+        group = list(range(offset + len(boxes)))
+
+        def find(node):
+            while group[node] != node:
+                group[node] = group[group[node]]
+                node = group[node]
+            return node
+
+        for t, d in zip(tracks, detections):
+            group[find(t)] = find(d + offset)
+        members = {}
+        for pair, t in enumerate(tracks):
+            members.setdefault(find(t), []).append(pair)
+
+        matched_tracks, matched_detections = [], []
+        for pairs in members.values():
+            if len(pairs) == 1:
+                matched_tracks.append(tracks[pairs[0]])
+                matched_detections.append(detections[pairs[0]])
+                continue
+            rows = sorted({tracks[p] for p in pairs})
+            cols = sorted({detections[p] for p in pairs})
+            row_of, col_of = {t: i for i, t in enumerate(rows)}, {d: j for j, d in enumerate(cols)}
+            sub = np.full((len(rows), len(cols)), 1e9)
+            for p in pairs:
+                sub[row_of[tracks[p]], col_of[detections[p]]] = cost[p]
+            # Each row's (or column's) cheapest entry is optimal when they don't collide
+            if len(rows) <= len(cols) and len(set(best := sub.argmin(1).tolist())) == len(rows):
+                assigned = zip(range(len(rows)), best)
+            elif len(rows) >= len(cols) and len(set(best := sub.argmin(0).tolist())) == len(cols):
+                assigned = zip(best, range(len(cols)))
+            else:
+                assigned = zip(*linear_assignment(sub))
+            for r, c in assigned:
+                if sub[r, c] < 1e9:
+                    matched_tracks.append(rows[r])
+                    matched_detections.append(cols[c])
+        return np.array(matched_tracks, dtype=np.int64), np.array(matched_detections, dtype=np.int64)
+
 
+# Tracker classes by name, for scripts that let the user pick one
+TRACKERS = {"euclidean": EuclideanDistTracker, "sort": SortTracker}
 
@@ -0,0 +1,167 @@
+"""Background AI worker for the Streamlit chess game.
+
+Searches run on a daemon thread, so a Streamlit rerun never blocks on the engine: the page
+asks for a move with ``think``, polls with ``wait`` and reruns until the reply is ready.
+While the human is on move the worker ponders: it guesses the human's likely replies and
+searches the AI's answer to each of them ahead of time. Finished searches are cached by
+(position key, strength) in a plain dict, normally one kept in ``st.session_state``, so a
+predicted reply is played as soon as the human moves.
+
+Only one job is queued at a time; a new request cancels the running search through the
+engine's ``stop_event`` (unless that search is already the one being asked for), and
+interrupted searches are never cached.
+
+The thread is started by the first job and exits after IDLE_TIMEOUT seconds without one,
+or at once on ``stop``; the next job starts a new thread. Streamlit gives no notice when a
+session ends, so this is what keeps abandoned sessions from leaving threads behind.
+"""
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+
+from chess_engine import STRENGTH_LEVELS, MoveOrderer, SearchEngine, SearchResult, TranspositionTable
+
+CacheKey = Tuple[int, str]
+
+# How many of the opponent's moves to answer in advance, and how hard to look for them
+PONDER_CANDIDATES = 6
+PONDER_SCOUT = {"max_depth": 2, "time_limit": 0.2}
+
+# Seconds the thread waits for a job before exiting
+IDLE_TIMEOUT = 60.0
+
+
+class AIWorker:
+    """A search thread with a single pending job slot and a position-keyed result cache"""
+
+    def __init__(self, cache: Optional[Dict[Hashable, SearchResult]] = None, max_cache: int = 4096,
+                 idle_timeout: float = IDLE_TIMEOUT):
+        self.cache = cache if cache is not None else {}
+        self.max_cache = max_cache
+        self.tt = TranspositionTable()  # only ever touched by the worker thread
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.job = None
+        self.running_key: Optional[CacheKey] = None
+        self.pondered: Optional[CacheKey] = None
+        self.idle_timeout = idle_timeout
+        self.stopping = False
+        self.thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def cache_key(game, strength: str) -> CacheKey:
+        return game.position_key(), strength
+
+    def think(self, game, strength: str) -> Optional[SearchResult]:
+        """The cached result for the side to move, or None after queueing a search for it
+
+        Not for the Random level, which needs no search.
+        """
+        key = self.cache_key(game, strength)
+        with self.condition:
+            if key in self.cache:
+                return self.cache[key]
+            if self.running_key != key and (self.job is None or self.job[1] != key):
+                self.submit(("think", key, game.clone(), strength))
+        return None
+
+    def ponder(self, game, strength: str):
+        """Search replies to the opponent's likely moves while the opponent (the side to move) thinks"""
+        key = self.cache_key(game, strength)
+        with self.condition:
+            if self.pondered == key:
+                return
+            self.pondered = key
+            self.submit(("ponder", key, game.clone(), strength))
+
+    def wait(self, game, strength: str, timeout: Optional[float] = None) -> Optional[SearchResult]:
+        """Block until the result for this position is cached or the timeout passes"""
+        key = self.cache_key(game, strength)
+        with self.condition:
+            self.condition.wait_for(lambda: key in self.cache, timeout)
+            return self.cache.get(key)
+
+    def submit(self, job):
+        """Replace the pending job and cancel the running search; call with the condition held"""
+        self.job = job
+        if self.running_key is not None:
+            self.stop_event.set()
+        self.stopping = False  # a thread still winding down after stop() takes this job instead
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="chess-ai-worker", daemon=True)
+            self.thread.start()
+        self.condition.notify_all()
+
+    def stop(self):
+        """Drop the pending job, cancel the running search and let the thread exit
+
+        Cached results are kept; the next think or ponder starts a new thread.
+        """
+        with self.condition:
+            self.job = None
+            self.pondered = None
+            if self.thread is not None:
+                self.stopping = True
+                self.stop_event.set()
+                self.condition.notify_all()
+
+    def store(self, key: CacheKey, result: SearchResult):
+        with self.condition:
+            self.cache[key] = result
+            while len(self.cache) > self.max_cache:
+                # Dicts keep insertion order, so this drops the oldest result
+                self.cache.pop(next(iter(self.cache)))
+            self.condition.notify_all()
+
+    def run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.job is not None or self.stopping, self.idle_timeout)
+                if self.job is None or self.stopping:
+                    # Idle or stopped: a later submit starts a new thread
+                    self.thread = None
+                    self.condition.notify_all()
+                    return
+                kind, key, game, strength = self.job
+                self.job = None
+                self.stop_event.clear()
+                self.running_key = key
+            if kind == "think":
+                self.search(key, game, strength)
+            else:
+                self.ponder_replies(game, strength)
+            with self.condition:
+                self.running_key = None
+                self.condition.notify_all()
+
+    def search(self, key: CacheKey, game, strength: str):
+        """Find a move as ChessGame.ai_move_for would (book, endgame tables, then search) and cache it"""
+        if key in self.cache:
+            return
+        game.ai_strength = strength
+        move, result = game.lookup_move()
+        if move is None:
+            result = SearchEngine(tt=self.tt, stop_event=self.stop_event, **STRENGTH_LEVELS[strength]).search(game)
+        if not self.stop_event.is_set():
+            self.store(key, result)
+
+    def ponder_replies(self, game, strength: str):
+        """Answer the opponent's most likely moves, best guess first, until a new job arrives"""
+        moves = game.get_all_legal_moves()
+        if not moves or STRENGTH_LEVELS[strength] is None:
+            return
+        scout = SearchEngine(tt=self.tt, stop_event=self.stop_event, **PONDER_SCOUT).search(game)
+        candidates = MoveOrderer().order_root(game, moves)
+        if scout.move in candidates:
+            candidates.remove(scout.move)
+            candidates.insert(0, scout.move)
+
+        for move in candidates[:PONDER_CANDIDATES]:
+            if self.job is not None or self.stop_event.is_set():
+                return
+            game.apply_move(move)
+            if game.get_all_legal_moves():
+                key = self.cache_key(game, strength)
+                with self.condition:
+                    self.running_key = key
+                self.search(key, game, strength)
+            game.retract_move()
@@ -0,0 +1,317 @@
+"""Bitboard backend for the Streamlit chess game.
+
+Squares are numbered ``row * 8 + col`` with the same layout as
+``ChessGame.board`` (row 0 is Black's back rank), so bit ``1 << sq`` maps
+straight onto a board position. Every (color, piece type) pair is stored as a
+64-bit integer and attacks come from precomputed tables.
+"""
+from typing import List, Optional, Tuple
+
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+
+
+def piece_code(color: int, piece_type: int) -> int:
+    """Single small-int encoding of a (color, piece type) pair, 0-11"""
+    return color * 6 + piece_type
+
+
+# Same offset/direction order as ChessGame so both backends list moves identically
+KNIGHT_OFFSETS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+KING_OFFSETS = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+ROOK_DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+BISHOP_DIRECTIONS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+DIRECTIONS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+ROOK_DIRS = range(0, 4)
+BISHOP_DIRS = range(4, 8)
+# A ray "increases" when its squares have growing indices, so the nearest blocker is the lowest bit
+POSITIVE_DIRS = frozenset(d for d, (dr, dc) in enumerate(DIRECTIONS) if dr > 0 or (dr == 0 and dc > 0))
+
+
+def _on_board(row: int, col: int) -> bool:
+    return 0 <= row < 8 and 0 <= col < 8
+
+
+def _build_leaper_table(offsets: List[Tuple[int, int]]) -> Tuple[List[int], List[List[int]]]:
+    """Attack bitboards and ordered target squares for a knight or king on every square"""
+    attacks, ordered = [], []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        targets = [(row + dr) * 8 + col + dc for dr, dc in offsets if _on_board(row + dr, col + dc)]
+        bb = 0
+        for target in targets:
+            bb |= 1 << target
+        attacks.append(bb)
+        ordered.append(targets)
+    return attacks, ordered
+
+
+def _build_rays() -> Tuple[List[List[int]], List[List[List[int]]]]:
+    """Ray bitboards and ray square lists (nearest first) for each direction and square"""
+    rays = [[0] * 64 for _ in DIRECTIONS]
+    ray_squares = [[[] for _ in range(64)] for _ in DIRECTIONS]
+    for d, (dr, dc) in enumerate(DIRECTIONS):
+        for sq in range(64):
+            row, col = divmod(sq, 8)
+            r, c = row + dr, col + dc
+            while _on_board(r, c):
+                rays[d][sq] |= 1 << (r * 8 + c)
+                ray_squares[d][sq].append(r * 8 + c)
+                r, c = r + dr, c + dc
+    return rays, ray_squares
+
+
+def _build_pawn_attacks() -> List[List[int]]:
+    table = [[0] * 64, [0] * 64]
+    for color, direction in ((WHITE, -1), (BLACK, 1)):
+        for sq in range(64):
+            row, col = divmod(sq, 8)
+            for dc in (-1, 1):
+                if _on_board(row + direction, col + dc):
+                    table[color][sq] |= 1 << ((row + direction) * 8 + col + dc)
+    return table
+
+
+KNIGHT_ATTACKS, KNIGHT_TARGETS = _build_leaper_table(KNIGHT_OFFSETS)
+KING_ATTACKS, KING_TARGETS = _build_leaper_table(KING_OFFSETS)
+RAYS, RAY_SQUARES = _build_rays()
+PAWN_ATTACKS = _build_pawn_attacks()
+ROOK_TARGETS = [[s for d in ROOK_DIRS for s in RAY_SQUARES[d][sq]] for sq in range(64)]
+BISHOP_TARGETS = [[s for d in BISHOP_DIRS for s in RAY_SQUARES[d][sq]] for sq in range(64)]
+QUEEN_TARGETS = [ROOK_TARGETS[sq] + BISHOP_TARGETS[sq] for sq in range(64)]
+
+# (right, color, king square, rook square, king target, squares that must be empty, squares the
+# king stands on or crosses, which must not be attacked), kingside before queenside
+CASTLING_RULES = [
+    ("K", WHITE, 60, 63, 62, (1 << 61) | (1 << 62), (60, 61, 62)),
+    ("Q", WHITE, 60, 56, 58, (1 << 57) | (1 << 58) | (1 << 59), (60, 59, 58)),
+    ("k", BLACK, 4, 7, 6, (1 << 5) | (1 << 6), (4, 5, 6)),
+    ("q", BLACK, 4, 0, 2, (1 << 1) | (1 << 2) | (1 << 3), (4, 3, 2)),
+]
+
+
+def ray_attacks(d: int, sq: int, occupied: int) -> int:
+    """Squares reached from sq along direction d, stopping at (and including) the first blocker"""
+    ray = RAYS[d][sq]
+    blockers = ray & occupied
+    if blockers:
+        if d in POSITIVE_DIRS:
+            first = (blockers & -blockers).bit_length() - 1
+        else:
+            first = blockers.bit_length() - 1
+        ray ^= RAYS[d][first]
+    return ray
+
+
+def rook_attacks(sq: int, occupied: int) -> int:
+    return ray_attacks(0, sq, occupied) | ray_attacks(1, sq, occupied) | \
+        ray_attacks(2, sq, occupied) | ray_attacks(3, sq, occupied)
+
+
+def bishop_attacks(sq: int, occupied: int) -> int:
+    return ray_attacks(4, sq, occupied) | ray_attacks(5, sq, occupied) | \
+        ray_attacks(6, sq, occupied) | ray_attacks(7, sq, occupied)
+
+
+def iter_squares(bb: int):
+    """Yield the set squares of a bitboard in ascending (row-major) order"""
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+class BitboardBoard:
+    """Piece placement as one bitboard per (color, piece type) plus a square lookup table"""
+
+    def __init__(self):
+        self.pieces = [[0] * 6, [0] * 6]
+        self.occupancy = [0, 0]
+        # squares[sq] is (color, piece_type) or None, for O(1) "what is on this square"
+        self.squares: List[Optional[Tuple[int, int]]] = [None] * 64
+
+    def put(self, color: int, piece_type: int, sq: int):
+        bit = 1 << sq
+        self.pieces[color][piece_type] |= bit
+        self.occupancy[color] |= bit
+        self.squares[sq] = (color, piece_type)
+
+    def remove(self, sq: int) -> Optional[Tuple[int, int]]:
+        entry = self.squares[sq]
+        if entry is not None:
+            color, piece_type = entry
+            bit = 1 << sq
+            self.pieces[color][piece_type] ^= bit
+            self.occupancy[color] ^= bit
+            self.squares[sq] = None
+        return entry
+
+    def move(self, from_sq: int, to_sq: int) -> Optional[Tuple[int, int]]:
+        """Move the piece on from_sq to to_sq and return whatever was captured there"""
+        captured = self.remove(to_sq)
+        color, piece_type = self.remove(from_sq)
+        self.put(color, piece_type, to_sq)
+        return captured
+
+    def king_square(self, color: int) -> Optional[int]:
+        king = self.pieces[color][KING]
+        return king.bit_length() - 1 if king else None
+
+    def is_attacked(self, sq: int, by_color: int) -> bool:
+        """Check if sq is attacked by any piece of by_color"""
+        attackers = self.pieces[by_color]
+        if KNIGHT_ATTACKS[sq] & attackers[KNIGHT]:
+            return True
+        if KING_ATTACKS[sq] & attackers[KING]:
+            return True
+        # A pawn of by_color hits sq exactly when an opposite-colored pawn on sq would hit it
+        if PAWN_ATTACKS[1 - by_color][sq] & attackers[PAWN]:
+            return True
+        occupied = self.occupancy[WHITE] | self.occupancy[BLACK]
+        straight = attackers[ROOK] | attackers[QUEEN]
+        if straight and rook_attacks(sq, occupied) & straight:
+            return True
+        diagonal = attackers[BISHOP] | attackers[QUEEN]
+        if diagonal and bishop_attacks(sq, occupied) & diagonal:
+            return True
+        return False
+
+    def pseudo_legal_targets(self, sq: int, en_passant: Optional[int] = None,
+                             castling_rights: str = "") -> List[int]:
+        """Target squares for the piece on sq, ignoring checks, in ChessGame's move order
+
+        en_passant is the square a pawn may capture onto en passant and castling_rights uses
+        FEN letters ("KQkq"); castling is returned as the king's two-square move.
+        """
+        color, piece_type = self.squares[sq]
+        own = self.occupancy[color]
+        occupied = own | self.occupancy[1 - color]
+
+        if piece_type == PAWN:
+            targets = []
+            direction = -8 if color == WHITE else 8
+            row = sq >> 3
+            one = sq + direction
+            if 0 <= one < 64 and not (occupied >> one) & 1:
+                targets.append(one)
+                start_row = 6 if color == WHITE else 1
+                two = one + direction
+                if row == start_row and not (occupied >> two) & 1:
+                    targets.append(two)
+            enemies = self.occupancy[1 - color]
+            if en_passant is not None:
+                enemies |= 1 << en_passant
+            targets.extend(iter_squares(PAWN_ATTACKS[color][sq] & enemies))
+            return targets
+
+        if piece_type == KNIGHT:
+            reachable = KNIGHT_ATTACKS[sq] & ~own
+            ordered = KNIGHT_TARGETS[sq]
+        elif piece_type == KING:
+            reachable = KING_ATTACKS[sq] & ~own
+            targets = [t for t in KING_TARGETS[sq] if (reachable >> t) & 1]
+            return targets + self.castling_targets(color, sq, castling_rights)
+        elif piece_type == ROOK:
+            reachable = rook_attacks(sq, occupied) & ~own
+            ordered = ROOK_TARGETS[sq]
+        elif piece_type == BISHOP:
+            reachable = bishop_attacks(sq, occupied) & ~own
+            ordered = BISHOP_TARGETS[sq]
+        else:
+            reachable = (rook_attacks(sq, occupied) | bishop_attacks(sq, occupied)) & ~own
+            ordered = QUEEN_TARGETS[sq]
+        return [t for t in ordered if (reachable >> t) & 1]
+
+    def castling_targets(self, color: int, sq: int, castling_rights: str) -> List[int]:
+        if not castling_rights:
+            return []
+        occupied = self.occupancy[WHITE] | self.occupancy[BLACK]
+        targets = []
+        for right, rule_color, king_sq, rook_sq, target, empty, path in CASTLING_RULES:
+            if (right in castling_rights and rule_color == color and sq == king_sq
+                    and self.squares[rook_sq] == (color, ROOK) and not occupied & empty
+                    and not any(self.is_attacked(p, 1 - color) for p in path)):
+                targets.append(target)
+        return targets
+
+    def leaves_king_safe(self, from_sq: int, to_sq: int, en_passant: Optional[int] = None) -> bool:
+        """Check if moving from_sq -> to_sq keeps the mover's king out of check"""
+        color, piece_type = self.squares[from_sq]
+        move_bits = (1 << from_sq) | (1 << to_sq)
+        captured_sq = to_sq
+        if piece_type == PAWN and to_sq == en_passant:
+            # The pawn taken en passant stands beside the mover, not on the target square
+            captured_sq = (from_sq & ~7) | (to_sq & 7)
+        captured = self.squares[captured_sq]
+
+        self.pieces[color][piece_type] ^= move_bits
+        self.occupancy[color] ^= move_bits
+        if captured is not None:
+            self.pieces[captured[0]][captured[1]] ^= 1 << captured_sq
+            self.occupancy[captured[0]] ^= 1 << captured_sq
+
+        king_sq = self.king_square(color)
+        safe = king_sq is None or not self.is_attacked(king_sq, 1 - color)
+
+        self.pieces[color][piece_type] ^= move_bits
+        self.occupancy[color] ^= move_bits
+        if captured is not None:
+            self.pieces[captured[0]][captured[1]] ^= 1 << captured_sq
+            self.occupancy[captured[0]] ^= 1 << captured_sq
+        return safe
+
+    def legal_targets(self, sq: int, en_passant: Optional[int] = None,
+                      castling_rights: str = "") -> List[int]:
+        return [t for t in self.pseudo_legal_targets(sq, en_passant, castling_rights)
+                if self.leaves_king_safe(sq, t, en_passant)]
+
+    def legal_moves(self, color: int, en_passant: Optional[int] = None,
+                    castling_rights: str = "") -> List[Tuple[int, int]]:
+        """All legal (from_sq, to_sq) pairs for color, scanning squares in row-major order"""
+        moves = []
+        for sq in iter_squares(self.occupancy[color]):
+            for target in self.pseudo_legal_targets(sq, en_passant, castling_rights):
+                if self.leaves_king_safe(sq, target, en_passant):
+                    moves.append((sq, target))
+        return moves
+
+    def capture_targets(self, sq: int, en_passant: Optional[int] = None) -> List[int]:
+        """Squares the piece on sq can capture on, ignoring checks (en passant included)"""
+        color, piece_type = self.squares[sq]
+        enemies = self.occupancy[1 - color]
+        occupied = self.occupancy[color] | enemies
+        if piece_type == PAWN:
+            if en_passant is not None:
+                enemies |= 1 << en_passant
+            attacks = PAWN_ATTACKS[color][sq]
+        elif piece_type == KNIGHT:
+            attacks = KNIGHT_ATTACKS[sq]
+        elif piece_type == KING:
+            attacks = KING_ATTACKS[sq]
+        elif piece_type == ROOK:
+            attacks = rook_attacks(sq, occupied)
+        elif piece_type == BISHOP:
+            attacks = bishop_attacks(sq, occupied)
+        else:
+            attacks = rook_attacks(sq, occupied) | bishop_attacks(sq, occupied)
+        return list(iter_squares(attacks & enemies))
+
+    def legal_captures(self, color: int, en_passant: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Legal capturing (from_sq, to_sq) pairs for color, without generating quiet moves"""
+        return [(sq, target) for sq in iter_squares(self.occupancy[color])
+                for target in self.capture_targets(sq, en_passant)
+                if self.leaves_king_safe(sq, target, en_passant)]
+
+    def legal_quiet_moves(self, color: int, en_passant: Optional[int] = None,
+                          castling_rights: str = "") -> List[Tuple[int, int]]:
+        """Legal non-capturing (from_sq, to_sq) pairs for color, including castling"""
+        enemies = self.occupancy[1 - color]
+        moves = []
+        for sq in iter_squares(self.occupancy[color]):
+            pawn = self.squares[sq][1] == PAWN
+            for target in self.pseudo_legal_targets(sq, en_passant, castling_rights):
+                if (enemies >> target) & 1 or (pawn and target == en_passant):
+                    continue
+                if self.leaves_king_safe(sq, target, en_passant):
+                    moves.append((sq, target))
+        return moves
@@ -0,0 +1,160 @@
+"""Memory-mapped opening book for the chess AI.
+
+The book file uses the Polyglot layout: 16-byte big-endian entries (position key, move,
+weight, learn) sorted by key, so a lookup is a binary search over the memory-mapped file
+and never loads it whole. Keys are ``ChessGame.position_key()`` rather than the Polyglot
+random numbers, and moves are packed as ``from_sq << 6 | to_sq`` with squares numbered
+``row * 8 + col`` like the rest of the game.
+
+Build (or rebuild) ``chess_book.bin`` from OPENING_LINES with:
+    python chess_book.py
+"""
+import mmap
+import os
+import random
+import struct
+from collections import Counter
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from chess_engine import Move
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chess_book.bin")
+ENTRY = struct.Struct(">QHHI")  # key, move, weight, learn
+
+# Main lines of common openings in coordinate notation; a move's weight is the number of
+# lines that play it from that position
+OPENING_LINES = [
+    # Open games
+    "e2e4 e7e5 g1f3 b8c6 f1b5 a7a6 b5a4 g8f6 e1g1 f8e7 f1e1 b7b5 a4b3 d7d6",
+    "e2e4 e7e5 g1f3 b8c6 f1b5 g8f6 e1g1 f6e4 d2d4 e4d6 b5c6 d7c6 d4e5 d6f5",
+    "e2e4 e7e5 g1f3 b8c6 f1c4 f8c5 c2c3 g8f6 d2d3 d7d6 e1g1 e8g8",
+    "e2e4 e7e5 g1f3 b8c6 f1c4 g8f6 d2d3 f8c5 c2c3 d7d6",
+    "e2e4 e7e5 g1f3 b8c6 d2d4 e5d4 f3d4 g8f6 d4c6 b7c6 e4e5 d8e7",
+    "e2e4 e7e5 g1f3 g8f6 f3e5 d7d6 e5f3 f6e4 d2d4 d6d5 f1d3",
+    "e2e4 e7e5 b1c3 g8f6 g1f3 b8c6 f1b5 f8b4",
+    # Sicilian
+    "e2e4 c7c5 g1f3 d7d6 d2d4 c5d4 f3d4 g8f6 b1c3 a7a6 c1e3 e7e5 d4b3 c8e6",
+    "e2e4 c7c5 g1f3 b8c6 d2d4 c5d4 f3d4 g8f6 b1c3 e7e5 d4b5 d7d6",
+    "e2e4 c7c5 g1f3 e7e6 d2d4 c5d4 f3d4 a7a6 f1d3 g8f6 e1g1",
+    "e2e4 c7c5 c2c3 g8f6 e4e5 f6d5 d2d4 c5d4 g1f3 b8c6",
+    # French, Caro-Kann, Scandinavian
+    "e2e4 e7e6 d2d4 d7d5 b1c3 g8f6 c1g5 f8e7 e4e5 f6d7 g5e7 d8e7",
+    "e2e4 e7e6 d2d4 d7d5 b1d2 c7c5 e4d5 e6d5 g1f3 b8c6",
+    "e2e4 c7c6 d2d4 d7d5 b1c3 d5e4 c3e4 c8f5 e4g3 f5g6 h2h4 h7h6",
+    "e2e4 c7c6 d2d4 d7d5 e4e5 c8f5 g1f3 e7e6 f1e2 c6c5",
+    "e2e4 d7d5 e4d5 d8d5 b1c3 d5a5 d2d4 g8f6 g1f3 c8f5",
+    # Queen's pawn
+    "d2d4 d7d5 c2c4 e7e6 b1c3 g8f6 c1g5 f8e7 e2e3 e8g8 g1f3 h7h6",
+    "d2d4 d7d5 c2c4 c7c6 g1f3 g8f6 b1c3 d5c4 a2a4 c8f5",
+    "d2d4 d7d5 c2c4 d5c4 g1f3 g8f6 e2e3 e7e6 f1c4 c7c5 e1g1 a7a6",
+    "d2d4 g8f6 c2c4 e7e6 b1c3 f8b4 e2e3 e8g8 f1d3 d7d5 g1f3 c7c5",
+    "d2d4 g8f6 c2c4 e7e6 g1f3 b7b6 g2g3 c8a6 b2b3 f8b4 c1d2 b4e7",
+    "d2d4 g8f6 c2c4 g7g6 b1c3 f8g7 e2e4 d7d6 g1f3 e8g8 f1e2 e7e5 e1g1 b8c6",
+    "d2d4 g8f6 c2c4 g7g6 b1c3 d7d5 c4d5 f6d5 e2e4 d5c3 b2c3 f8g7",
+    "d2d4 g8f6 g1f3 e7e6 c1g5 c7c5 e2e3 b7b6",
+    "d2d4 d7d5 g1f3 g8f6 c1f4 e7e6 e2e3 c7c5 c2c3 b8c6",
+    # Flank openings
+    "c2c4 e7e5 b1c3 g8f6 g1f3 b8c6 g2g3 d7d5 c4d5 f6d5",
+    "c2c4 g8f6 b1c3 e7e6 e2e4 d7d5 e4e5 d5d4",
+    "g1f3 d7d5 g2g3 g8f6 f1g2 e7e6 e1g1 f8e7 c2c4 e8g8",
+    "g1f3 g8f6 c2c4 g7g6 b1c3 f8g7 e2e4 d7d6 d2d4 e8g8",
+]
+
+
+def encode_move(move: Move) -> int:
+    from_row, from_col, to_row, to_col = move
+    return (from_row * 8 + from_col) << 6 | (to_row * 8 + to_col)
+
+
+def decode_move(code: int) -> Move:
+    from_sq, to_sq = code >> 6 & 63, code & 63
+    return from_sq >> 3, from_sq & 7, to_sq >> 3, to_sq & 7
+
+
+def parse_coordinate_move(text: str) -> Move:
+    """Parse coordinate notation, e.g. "e2e4" -> (6, 4, 4, 4)"""
+    files, ranks = "abcdefgh", "87654321"
+    return ranks.index(text[1]), files.index(text[0]), ranks.index(text[3]), files.index(text[2])
+
+
+def build(lines: List[str] = OPENING_LINES, path: str = BOOK_PATH) -> int:
+    """Replay the opening lines and write every (position, move) pair as a sorted book"""
+    from chess_game import ChessGame  # chess_game imports this module for AI moves
+
+    weights: Counter = Counter()
+    for line in lines:
+        game = ChessGame(backend="bitboard")
+        for text in line.split():
+            move = parse_coordinate_move(text)
+            key = game.position_key()
+            if not game.make_move(*move):
+                raise ValueError(f"Illegal book move {text} in line {line!r}")
+            weights[(key, encode_move(move))] += 1
+
+    with open(path, "wb") as f:
+        for (key, code), weight in sorted(weights.items()):
+            f.write(ENTRY.pack(key, code, weight, 0))
+    return len(weights)
+
+
+class OpeningBook:
+    """Read-only view of a book file, memory-mapped and searched in place"""
+
+    def __init__(self, path: str = BOOK_PATH):
+        self.path = path
+        self.size = os.path.getsize(path) // ENTRY.size
+        self.file = open(path, "rb")
+        # mmap cannot map an empty file
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+
+    def key_at(self, index: int) -> int:
+        return struct.unpack_from(">Q", self.data, index * ENTRY.size)[0]
+
+    def entries(self, key: int) -> List[Tuple[Move, int]]:
+        """(move, weight) for every book move from the position with this key"""
+        low, high = 0, self.size
+        while low < high:
+            mid = (low + high) // 2
+            if self.key_at(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        found = []
+        while low < self.size:
+            entry_key, code, weight, _ = ENTRY.unpack_from(self.data, low * ENTRY.size)
+            if entry_key != key:
+                break
+            found.append((decode_move(code), weight))
+            low += 1
+        return found
+
+    def choose(self, game, rng: Optional[random.Random] = None) -> Optional[Move]:
+        """A legal book move for the side to move, picked with probability proportional to weight"""
+        entries = self.entries(game.position_key())
+        if not entries:
+            return None
+        legal = set(game.get_all_legal_moves())
+        candidates = [(move, weight) for move, weight in entries if move in legal]
+        if not candidates:
+            return None
+        moves, weights = zip(*candidates)
+        return (rng or random).choices(moves, weights)[0]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def close(self):
+        if self.size:
+            self.data.close()
+        self.file.close()
+
+
+@lru_cache(maxsize=1)
+def default_book() -> Optional[OpeningBook]:
+    """The bundled book, opened once per process, or None if it has not been built"""
+    return OpeningBook() if os.path.exists(BOOK_PATH) else None
+
+
+if __name__ == "__main__":
+    print(f"wrote {build()} book entries to {BOOK_PATH}")
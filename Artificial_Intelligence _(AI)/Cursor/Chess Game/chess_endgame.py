@@ -0,0 +1,183 @@
+"""Precomputed KQK and KRK endgame tables for the chess AI.
+
+Each table holds the distance to mate for every king + queen (or rook) vs king position,
+solved once by retrograde analysis and stored in ``chess_endgame.bin``. The eight board
+symmetries let every position be looked up with the strong side's king in the a8-d8-d5
+triangle, so a table has 10 * 64 * 64 * 2 entries of one byte each.
+
+Build (or rebuild) the table file with:
+    python chess_endgame.py
+"""
+import os
+import zlib
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from chess_bitboard import KING_ATTACKS, QUEEN, ROOK, bishop_attacks, iter_squares, rook_attacks
+from chess_engine import MATE_SCORE, Move
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chess_endgame.bin")
+TABLE_PIECES = (QUEEN, ROOK)
+PIECE_NAMES = {"queen": QUEEN, "rook": ROOK}
+TABLE_SIZE = 10 * 64 * 64 * 2
+ATTACKER_TO_MOVE, DEFENDER_TO_MOVE = 0, 1
+
+
+def _build_symmetry() -> Tuple[List[List[int]], List[int], List[int]]:
+    """Square maps for the 8 board symmetries, the one that puts each square in the triangle,
+    and the triangle index (or -1) of every square"""
+    transforms = []
+    for flip_row in (False, True):
+        for flip_col in (False, True):
+            for swap in (False, True):
+                mapping = []
+                for sq in range(64):
+                    row, col = divmod(sq, 8)
+                    row, col = (7 - row if flip_row else row), (7 - col if flip_col else col)
+                    if swap:
+                        row, col = col, row
+                    mapping.append(row * 8 + col)
+                transforms.append(mapping)
+    triangle = [-1] * 64
+    for index, (row, col) in enumerate((r, c) for r in range(4) for c in range(r, 4)):
+        triangle[row * 8 + col] = index
+    canonical = [next(t for t, mapping in enumerate(transforms) if triangle[mapping[sq]] >= 0)
+                 for sq in range(64)]
+    return transforms, canonical, triangle
+
+
+TRANSFORMS, KING_TRANSFORM, TRIANGLE_INDEX = _build_symmetry()
+TRIANGLE_SQUARES = [sq for sq in range(64) if TRIANGLE_INDEX[sq] >= 0]
+
+
+def table_index(king: int, piece: int, defender: int, side: int) -> int:
+    """Table slot for a position, reduced by symmetry"""
+    mapping = TRANSFORMS[KING_TRANSFORM[king]]
+    return ((TRIANGLE_INDEX[mapping[king]] * 64 + mapping[piece]) * 64 + mapping[defender]) * 2 + side
+
+
+def piece_attacks(piece_type: int, sq: int, occupied: int) -> int:
+    if piece_type == ROOK:
+        return rook_attacks(sq, occupied)
+    return rook_attacks(sq, occupied) | bishop_attacks(sq, occupied)
+
+
+def solve(piece_type: int) -> bytearray:
+    """Retrograde analysis of king + piece vs king
+
+    Entry values are 0 for draws and illegal positions, otherwise 1 + the number of plies
+    until the defending king is mated with best play.
+    """
+    dtm = bytearray(TABLE_SIZE)
+    remaining = array("B", bytes(TABLE_SIZE))
+    parents: List[List[int]] = [[] for _ in range(TABLE_SIZE)]
+    mated = []
+
+    for king in TRIANGLE_SQUARES:
+        for piece in range(64):
+            for defender in range(64):
+                if len({king, piece, defender}) < 3 or (KING_ATTACKS[king] >> defender) & 1:
+                    continue
+                covered = KING_ATTACKS[king] | piece_attacks(piece_type, piece, 1 << king)
+                in_check = (covered >> defender) & 1
+
+                # Attacker to move (legal only if the defender is not in check)
+                if not in_check:
+                    node = table_index(king, piece, defender, ATTACKER_TO_MOVE)
+                    occupied = (1 << king) | (1 << piece) | (1 << defender)
+                    for target in iter_squares(KING_ATTACKS[king] & ~KING_ATTACKS[defender] & ~(1 << piece)):
+                        parents[table_index(target, piece, defender, DEFENDER_TO_MOVE)].append(node)
+                    for target in iter_squares(piece_attacks(piece_type, piece, occupied)
+                                               & ~(1 << king) & ~(1 << defender)):
+                        parents[table_index(king, target, defender, DEFENDER_TO_MOVE)].append(node)
+
+                # Defender to move; taking an unprotected piece is a draw, so that node never resolves
+                node = table_index(king, piece, defender, DEFENDER_TO_MOVE)
+                moves = 0
+                for target in iter_squares(KING_ATTACKS[defender]):
+                    if target == piece:
+                        moves += not (KING_ATTACKS[king] >> piece) & 1
+                    elif not (covered >> target) & 1:
+                        parents[table_index(king, piece, target, ATTACKER_TO_MOVE)].append(node)
+                        moves += 1
+                remaining[node] = moves
+                if not moves and in_check:
+                    dtm[node] = 1
+                    mated.append(node)
+
+    # Breadth-first from the mates: an attacker node is won as soon as one child is lost for the
+    # defender, a defender node is lost once all of its children are won for the attacker
+    queue, head = mated, 0
+    while head < len(queue):
+        child = queue[head]
+        head += 1
+        value = dtm[child] + 1
+        for parent in parents[child]:
+            if dtm[parent]:
+                continue
+            if parent & 1 == DEFENDER_TO_MOVE:
+                remaining[parent] -= 1
+                if remaining[parent]:
+                    continue
+            dtm[parent] = value
+            queue.append(parent)
+    return dtm
+
+
+def build(path: str = TABLE_PATH):
+    tables = b"".join(bytes(solve(piece_type)) for piece_type in TABLE_PIECES)
+    with open(path, "wb") as f:
+        f.write(zlib.compress(tables, 9))
+
+
+@lru_cache(maxsize=1)
+def load_tables(path: str = TABLE_PATH) -> Dict[int, bytes]:
+    """The tables by piece type, solved in memory if the table file is missing"""
+    if not os.path.exists(path):
+        return {piece_type: bytes(solve(piece_type)) for piece_type in TABLE_PIECES}
+    with open(path, "rb") as f:
+        data = zlib.decompress(f.read())
+    return {piece_type: data[i * TABLE_SIZE:(i + 1) * TABLE_SIZE] for i, piece_type in enumerate(TABLE_PIECES)}
+
+
+def probe(game) -> Optional[int]:
+    """Score of a KQK/KRK position for the side to move (mate scores as in the search, 0 for a
+    draw), or None when the position is not covered by the tables"""
+    pieces = [(game.board[row][col], row * 8 + col)
+              for squares in game.piece_squares.values() for row, col in squares]
+    if len(pieces) == 2:
+        return 0  # bare kings
+    if len(pieces) != 3:
+        return None
+    strong = [(piece, sq) for piece, sq in pieces if piece.type != "king"]
+    if strong[0][0].type not in PIECE_NAMES:
+        return None
+    piece, piece_sq = strong[0]
+    king_sq = next(sq for p, sq in pieces if p.type == "king" and p.color == piece.color)
+    defender_sq = next(sq for p, sq in pieces if p.color != piece.color)
+    side = ATTACKER_TO_MOVE if game.current_player == piece.color else DEFENDER_TO_MOVE
+    value = load_tables()[PIECE_NAMES[piece.type]][table_index(king_sq, piece_sq, defender_sq, side)]
+    if not value:
+        return 0
+    plies = value - 1
+    return MATE_SCORE - plies if side == ATTACKER_TO_MOVE else -(MATE_SCORE - plies)
+
+
+def best_move(game) -> Tuple[Optional[Move], Optional[int]]:
+    """The table's best move and its score, or (None, None) outside the tables"""
+    if probe(game) is None:
+        return None, None
+    best, best_score = None, None
+    for move in game.get_all_legal_moves():
+        game.apply_move(move)
+        score = -probe(game)
+        game.retract_move()
+        if best_score is None or score > best_score:
+            best, best_score = move, score
+    return best, best_score
+
+
+if __name__ == "__main__":
+    build()
+    print(f"wrote {TABLE_PATH}")
@@ -0,0 +1,432 @@
+"""Alpha-beta search engine for the Streamlit chess game.
+
+The engine drives a ``ChessGame`` through its legal move generators and
+``apply_move``/``retract_move``, so it works with either board backend.
+Tables are keyed by the string values of ``PieceType``/``Color`` (both are str
+enums) or by the integer piece codes from ``chess_bitboard``, which keeps this
+module free of imports from ``chess_game``.
+"""
+import random
+import threading
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from chess_bitboard import BLACK, BISHOP, KING, KNIGHT, PAWN, QUEEN, ROOK, WHITE, piece_code
+
+Move = Tuple[int, int, int, int]
+
+MATE_SCORE = 100000
+INFINITY = 10 * MATE_SCORE
+# Scores this close to MATE_SCORE are "mate in n" and are stored relative to the node's ply
+MATE_THRESHOLD = MATE_SCORE - 1000
+
+# Transposition table bound types
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+PIECE_VALUES = {"pawn": 100, "knight": 320, "bishop": 330, "rook": 500, "queen": 900, "king": 0}
+# Most valuable victim / least valuable attacker: rank captures by victim first, then attacker
+# indexed by Piece.kind
+MVV_LVA_RANKS = [0] * 6
+for _kind, _rank in ((PAWN, 1), (KNIGHT, 2), (BISHOP, 3), (ROOK, 4), (QUEEN, 5), (KING, 6)):
+    MVV_LVA_RANKS[_kind] = _rank
+MAX_PLY = 128
+
+# Piece-square tables from White's point of view, indexed row * 8 + col with row 0 = rank 8
+# (the same layout as ChessGame.board). Black looks them up on the mirrored row.
+PIECE_SQUARE_TABLES = {
+    "pawn": [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ],
+    "knight": [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ],
+    "bishop": [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ],
+    "rook": [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0,
+    ],
+    "queen": [
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20,
+    ],
+    "king": [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20,
+    ],
+}
+
+# Material plus placement for every (color, type, square), folded into one lookup
+PIECE_KINDS = {"pawn": PAWN, "knight": KNIGHT, "bishop": BISHOP, "rook": ROOK, "queen": QUEEN, "king": KING}
+
+# Material plus piece-square value, indexed by Piece.code then square; Black's scores are negated
+SQUARE_SCORES: List[List[int]] = [[] for _ in range(12)]
+for _type, _table in PIECE_SQUARE_TABLES.items():
+    SQUARE_SCORES[piece_code(WHITE, PIECE_KINDS[_type])] = [PIECE_VALUES[_type] + v for v in _table]
+    SQUARE_SCORES[piece_code(BLACK, PIECE_KINDS[_type])] = [
+        -(PIECE_VALUES[_type] + _table[(7 - sq // 8) * 8 + sq % 8]) for sq in range(64)]
+
+# Sidebar strength levels: None plays a random legal move
+STRENGTH_LEVELS: Dict[str, Optional[dict]] = {
+    "Random": None,
+    "Easy": {"max_depth": 1, "time_limit": 0.3},
+    "Medium": {"max_depth": 3, "time_limit": 1.0},
+    "Hard": {"max_depth": 6, "time_limit": 2.5},
+}
+
+
+class SearchResult(NamedTuple):
+    move: Optional[Move]
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+    source: str = "search"  # or "book" / "endgame table" for moves played without searching
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class TTEntry(NamedTuple):
+    key: int
+    depth: int
+    score: int
+    bound: int
+    move: Optional[Move]
+    generation: int
+
+
+class TranspositionTable:
+    """Fixed-size hash table of search results keyed by ChessGame.position_key()
+
+    Each key maps to one slot (key & mask). A slot is overwritten when it is empty, holds the
+    same position, was written by an earlier search, or the new result is at least as deep,
+    so deep results from the current search survive while stale ones are recycled.
+    """
+
+    def __init__(self, size_bits: int = 16):
+        self.mask = (1 << size_bits) - 1
+        self.slots: List[Optional[TTEntry]] = [None] * (1 << size_bits)
+        self.generation = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def clear(self):
+        self.slots = [None] * len(self.slots)
+        self.generation = 0
+
+    def probe(self, key: int) -> Optional[TTEntry]:
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry.key == key:
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, score: int, bound: int, move: Optional[Move]):
+        index = key & self.mask
+        old = self.slots[index]
+        if (old is None or old.key == key or old.generation != self.generation
+                or depth >= old.depth):
+            self.slots[index] = TTEntry(key, depth, score, bound, move, self.generation)
+
+    def __len__(self) -> int:
+        return sum(1 for entry in self.slots if entry is not None)
+
+
+def score_to_tt(score: int, ply: int) -> int:
+    """Make mate scores relative to this node so they stay valid at other plies"""
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def score_from_tt(score: int, ply: int) -> int:
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+def evaluate(game) -> int:
+    """Material plus piece-square score in centipawns from the side to move's point of view"""
+    score = 0
+    board = game.board
+    for squares in game.piece_squares.values():
+        for row, col in squares:
+            score += SQUARE_SCORES[board[row][col].code][row * 8 + col]
+    return score if game.current_player == "white" else -score
+
+
+class MoveOrderer:
+    """Orders moves so alpha-beta tries the likely best ones first
+
+    Moves come out in stages: the transposition table move, captures by MVV-LVA, the two
+    killer moves of this ply (quiet moves that caused a cutoff in a sibling node), then the
+    remaining quiet moves by history score. Quiet moves are only generated once the captures
+    have failed to produce a cutoff.
+    """
+
+    def __init__(self):
+        self.killers: List[List[Optional[Move]]] = [[None, None] for _ in range(MAX_PLY)]
+        # (color, move) -> sum of depth * depth over the cutoffs the quiet move caused
+        self.history: Dict[Tuple[str, Move], int] = {}
+
+    @staticmethod
+    def mvv_lva(game, move: Move) -> int:
+        victim = game.captured_piece(move)
+        attacker = game.board[move[0]][move[1]]
+        return MVV_LVA_RANKS[victim.kind] * 8 - MVV_LVA_RANKS[attacker.kind]
+
+    def order_captures(self, game, captures: List[Move]) -> List[Move]:
+        return sorted(captures, key=lambda move: self.mvv_lva(game, move), reverse=True)
+
+    def order_root(self, game, moves: List[Move]) -> List[Move]:
+        """Captures by MVV-LVA, then quiet moves in generation order"""
+        captures = [move for move in moves if game.captured_piece(move)]
+        return self.order_captures(game, captures) + [move for move in moves if move not in captures]
+
+    def staged_moves(self, game, ply: int, tt_move: Optional[Move] = None) -> Iterator[Move]:
+        """Yield the legal moves of the current position, best candidates first"""
+        if tt_move is not None and self.is_legal(game, tt_move):
+            yield tt_move
+        for move in self.order_captures(game, game.get_legal_captures()):
+            if move != tt_move:
+                yield move
+
+        quiet = game.get_legal_quiet_moves()
+        killers = [k for k in self.killers[min(ply, MAX_PLY - 1)] if k is not None and k != tt_move]
+        for killer in killers:
+            if killer in quiet:
+                yield killer
+        color = game.current_player
+        history = self.history
+        quiet.sort(key=lambda move: history.get((color, move), 0), reverse=True)
+        for move in quiet:
+            if move != tt_move and move not in killers:
+                yield move
+
+    @staticmethod
+    def is_legal(game, move: Move) -> bool:
+        piece = game.board[move[0]][move[1]]
+        return (piece is not None and piece.color == game.current_player
+                and (move[2], move[3]) in game.get_possible_moves(move[0], move[1]))
+
+    def record_cutoff(self, game, move: Move, depth: int, ply: int):
+        """Remember a quiet move that refuted the position as a killer and in the history table"""
+        if game.captured_piece(move):
+            return
+        killers = self.killers[min(ply, MAX_PLY - 1)]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        key = (game.current_player, move)
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+
+class SearchEngine:
+    """Negamax with alpha-beta pruning, quiescence and iterative deepening under a time budget
+
+    The clock is read every ``check_interval`` nodes, so a search never overruns its budget by
+    more than that many nodes; an interrupted iteration is discarded in favour of the last
+    completed one. With ``move_ordering`` off, moves are searched in generation order (apart
+    from the transposition table move), which is only useful for benchmarking. Setting
+    ``stop_event`` from another thread ends the search at the next clock check.
+    """
+
+    def __init__(self, max_depth: int = 3, time_limit: float = 1.0, check_interval: int = 64,
+                 tt: Optional[TranspositionTable] = None, move_ordering: bool = True,
+                 stop_event: Optional[threading.Event] = None):
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.check_interval = check_interval
+        self.tt = tt if tt is not None else TranspositionTable()
+        self.move_ordering = move_ordering
+        self.stop_event = stop_event
+        self.orderer = MoveOrderer()
+        self.nodes = 0
+        self.stopped = False
+        self.deadline = 0.0
+
+    def search(self, game) -> SearchResult:
+        """Search the current position and return the best move found within the budget"""
+        start = time.perf_counter()
+        self.deadline = start + self.time_limit
+        self.nodes = 0
+        self.stopped = False
+        self.tt.new_search()
+        self.orderer = MoveOrderer()
+
+        moves = game.get_all_legal_moves()
+        if not moves:
+            return SearchResult(None, 0, 0, 0, 0.0)
+        if self.move_ordering:
+            moves = self.orderer.order_root(game, moves)
+        best = SearchResult(moves[0], 0, 0, 0, 0.0)
+
+        for depth in range(1, self.max_depth + 1):
+            score, move = self.search_root(game, moves, depth)
+            if self.stopped:
+                break
+            best = SearchResult(move, score, depth, self.nodes, time.perf_counter() - start)
+            # Re-search the principal move first at the next depth
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= MATE_SCORE - 100:
+                break
+        return best._replace(nodes=self.nodes, elapsed=time.perf_counter() - start)
+
+    def search_root(self, game, moves: List[Move], depth: int) -> Tuple[int, Move]:
+        alpha, beta = -INFINITY, INFINITY
+        best_move = moves[0]
+        for move in moves:
+            game.apply_move(move)
+            score = -self.negamax(game, depth - 1, -beta, -alpha, 1)
+            game.retract_move()
+            if self.stopped:
+                break
+            if score > alpha:
+                alpha, best_move = score, move
+        if not self.stopped:
+            self.tt.store(game.position_key(), depth, alpha, EXACT, best_move)
+        return alpha, best_move
+
+    def negamax(self, game, depth: int, alpha: int, beta: int, ply: int) -> int:
+        if self.tick():
+            return 0
+        if game.is_repetition():
+            return 0
+        if depth <= 0:
+            return self.quiescence(game, alpha, beta)
+
+        key = game.position_key()
+        entry = self.tt.probe(key)
+        tt_move = None
+        if entry is not None:
+            tt_move = entry.move
+            if entry.depth >= depth:
+                score = score_from_tt(entry.score, ply)
+                if entry.bound == EXACT:
+                    return score
+                if entry.bound == LOWER_BOUND and score >= beta:
+                    return score
+                if entry.bound == UPPER_BOUND and score <= alpha:
+                    return score
+
+        if self.move_ordering:
+            moves = self.orderer.staged_moves(game, ply, tt_move)
+        else:
+            moves = game.get_all_legal_moves()
+            if tt_move in moves:
+                moves.remove(tt_move)
+                moves.insert(0, tt_move)
+
+        original_alpha = alpha
+        best_move = None
+        searched = 0
+        for move in moves:
+            searched += 1
+            game.apply_move(move)
+            score = -self.negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            game.retract_move()
+            if self.stopped:
+                return 0
+            if score >= beta:
+                self.tt.store(key, depth, score_to_tt(beta, ply), LOWER_BOUND, move)
+                if self.move_ordering:
+                    self.orderer.record_cutoff(game, move, depth, ply)
+                return beta
+            if score > alpha:
+                alpha, best_move = score, move
+        if not searched:
+            return -MATE_SCORE + ply if game.in_check(game.current_player) else 0
+        bound = EXACT if alpha > original_alpha else UPPER_BOUND
+        self.tt.store(key, depth, score_to_tt(alpha, ply), bound, best_move)
+        return alpha
+
+    def quiescence(self, game, alpha: int, beta: int) -> int:
+        """Resolve captures before trusting the static evaluation"""
+        stand_pat = evaluate(game)
+        if stand_pat >= beta:
+            return beta
+        alpha = max(alpha, stand_pat)
+
+        captures = game.get_legal_captures()
+        if self.move_ordering:
+            captures = self.orderer.order_captures(game, captures)
+        for move in captures:
+            if self.tick():
+                return 0
+            game.apply_move(move)
+            score = -self.quiescence(game, -beta, -alpha)
+            game.retract_move()
+            if self.stopped:
+                return 0
+            if score >= beta:
+                return beta
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    def tick(self) -> bool:
+        """Count a node and report whether the time budget is used up (or the search was cancelled)"""
+        self.nodes += 1
+        if self.nodes % self.check_interval == 0 and (
+                time.perf_counter() >= self.deadline
+                or (self.stop_event is not None and self.stop_event.is_set())):
+            self.stopped = True
+        return self.stopped
+
+
+def choose_move(game, strength: str, tt: Optional[TranspositionTable] = None
+                ) -> Tuple[Optional[Move], Optional[SearchResult]]:
+    """Pick a move for the side to move at the given STRENGTH_LEVELS setting"""
+    settings = STRENGTH_LEVELS[strength]
+    if settings is None:
+        moves = game.get_all_legal_moves()
+        return (random.choice(moves) if moves else None), None
+    result = SearchEngine(tt=tt, **settings).search(game)
+    return result.move, result
@@ -1,10 +1,20 @@
 import streamlit as st
-import copy
 import random
-from typing import List, Tuple, Optional, Dict
+import struct
+from typing import List, Tuple, Optional, Dict, NamedTuple, Set
 from enum import Enum
+import time
+import chess_bitboard as bitboard
+import chess_endgame
+from chess_ai_worker import AIWorker
+from chess_book import default_book
+from chess_players import FirstMovePlayer, Player
+from chess_render import BoardRenderer
+from chess_engine import STRENGTH_LEVELS, SearchResult, TranspositionTable, choose_move
 
-class PieceType(Enum):
+# str mixins make members compare by value: Streamlit re-executes this script on every
+# rerun, redefining these classes while the game in session_state keeps the old members
+class PieceType(str, Enum):
     PAWN = "pawn"
     ROOK = "rook"
     KNIGHT = "knight"
@@ -12,35 +22,110 @@ class PieceType(Enum):
     QUEEN = "queen"
     KING = "king"
 
-class Color(Enum):
+class Color(str, Enum):
     WHITE = "white"
     BLACK = "black"
 
+PIECE_INDEX = {
+    PieceType.PAWN: bitboard.PAWN,
+    PieceType.KNIGHT: bitboard.KNIGHT,
+    PieceType.BISHOP: bitboard.BISHOP,
+    PieceType.ROOK: bitboard.ROOK,
+    PieceType.QUEEN: bitboard.QUEEN,
+    PieceType.KING: bitboard.KING,
+}
+COLOR_INDEX = {Color.WHITE: bitboard.WHITE, Color.BLACK: bitboard.BLACK}
+
+# Symbols indexed by piece code (bitboard.piece_code: color * 6 + type index). A tuple so every
+# piece shares the same str objects (indexing a non-Latin-1 str allocates a new one each time)
+PIECE_SYMBOLS = tuple("♙♘♗♖♕♔♟♞♝♜♛♚")
+
 class Piece:
+    """A piece with its small-integer encoding precomputed
+
+    kind is the bitboard type index and code = color * 6 + kind, so hot loops can index
+    tables instead of hashing (color, type) pairs. __slots__ drops the per-piece __dict__.
+    """
+    __slots__ = ("type", "color", "kind", "code", "symbol", "has_moved")
+
     def __init__(self, piece_type: PieceType, color: Color):
         self.type = piece_type
         self.color = color
+        self.kind = PIECE_INDEX[piece_type]
+        self.code = bitboard.piece_code(COLOR_INDEX[color], self.kind)
+        self.symbol = PIECE_SYMBOLS[self.code]
         self.has_moved = False
-    
+
     def get_symbol(self) -> str:
-        symbols = {
-            (PieceType.PAWN, Color.WHITE): "♙",
-            (PieceType.ROOK, Color.WHITE): "♖",
-            (PieceType.KNIGHT, Color.WHITE): "♘",
-            (PieceType.BISHOP, Color.WHITE): "♗",
-            (PieceType.QUEEN, Color.WHITE): "♕",
-            (PieceType.KING, Color.WHITE): "♔",
-            (PieceType.PAWN, Color.BLACK): "♟",
-            (PieceType.ROOK, Color.BLACK): "♜",
-            (PieceType.KNIGHT, Color.BLACK): "♞",
-            (PieceType.BISHOP, Color.BLACK): "♝",
-            (PieceType.QUEEN, Color.BLACK): "♛",
-            (PieceType.KING, Color.BLACK): "♚",
-        }
-        return symbols.get((self.type, self.color), "?")
+        return self.symbol
+
+class MoveRecord(NamedTuple):
+    """Everything needed to take a move back off the board"""
+    from_row: int
+    from_col: int
+    to_row: int
+    to_col: int
+    piece: Piece
+    captured: Optional[Piece]
+    had_moved: bool
+    captured_square: Tuple[int, int]  # differs from the target square for en passant
+    rook_move: Optional[Tuple[int, int, int, Optional[Piece]]]  # (row, from_col, to_col, piece it displaced) when castling
+    promoted: Optional[Piece]
+    castling_rights: str  # rights, en passant square and halfmove clock before the move
+    en_passant: Optional[Tuple[int, int]]
+    halfmove_clock: int
+
+# "array" scans the 8x8 list of Piece objects; "bitboard" uses chess_bitboard lookup tables
+BACKENDS = ("array", "bitboard")
+
+# Zobrist keys: a position's hash is the XOR of one key per (color, type, square) occupied,
+# plus ZOBRIST_BLACK_TO_MOVE when Black is on move. The fixed seed keeps hashes stable
+# across Streamlit reruns and processes.
+_zobrist_rng = random.Random(20250101)
+ZOBRIST_PIECE_KEYS = {(color, piece_type): [_zobrist_rng.getrandbits(64) for _ in range(64)]
+                      for color in Color for piece_type in PieceType}
+ZOBRIST_BLACK_TO_MOVE = _zobrist_rng.getrandbits(64)
+ZOBRIST_CODE_KEYS = [ZOBRIST_PIECE_KEYS[(color, piece_type)]
+                     for color in sorted(COLOR_INDEX, key=COLOR_INDEX.get)
+                     for piece_type in sorted(PIECE_INDEX, key=PIECE_INDEX.get)]
+ZOBRIST_CASTLING = {right: _zobrist_rng.getrandbits(64) for right in "KQkq"}
+ZOBRIST_EN_PASSANT_FILE = [_zobrist_rng.getrandbits(64) for _ in range(8)]
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+FEN_PIECE_TYPES = {"p": PieceType.PAWN, "n": PieceType.KNIGHT, "b": PieceType.BISHOP,
+                   "r": PieceType.ROOK, "q": PieceType.QUEEN, "k": PieceType.KING}
+FEN_LETTERS = {piece_type: letter for letter, piece_type in FEN_PIECE_TYPES.items()}
+PIECE_TYPE_ORDER = sorted(PIECE_INDEX, key=PIECE_INDEX.get)
+
+# Packed position: occupancy bitboard, one 4-bit piece code (color * 6 + type) per occupied
+# square in square order, flags (bit 0 black to move, bits 1-4 KQkq), en passant file + 1
+# (0 for none), halfmove clock and fullmove number. 29 bytes for any legal position.
+PACKED_POSITION = struct.Struct(">Q16sBBBH")
+PROMOTION_TYPES = (PieceType.QUEEN, PieceType.ROOK, PieceType.BISHOP, PieceType.KNIGHT)
+
+# Moving from or capturing on one of these squares removes the listed castling rights
+CASTLING_SQUARES = {(7, 4): "KQ", (7, 7): "K", (7, 0): "Q", (0, 4): "kq", (0, 7): "k", (0, 0): "q"}
+# (right, color, row, rook column, king target column, columns that must be empty,
+#  columns the king stands on or crosses, which must not be attacked)
+CASTLING_RULES = [
+    ("K", Color.WHITE, 7, 7, 6, (5, 6), (4, 5, 6)),
+    ("Q", Color.WHITE, 7, 0, 2, (1, 2, 3), (4, 3, 2)),
+    ("k", Color.BLACK, 0, 7, 6, (5, 6), (4, 5, 6)),
+    ("q", Color.BLACK, 0, 0, 2, (1, 2, 3), (4, 3, 2)),
+]
+
+# Indexed by Piece.kind; None for the pieces that do not slide
+SLIDER_DIRECTIONS = [None] * 6
+SLIDER_DIRECTIONS[bitboard.ROOK] = bitboard.ROOK_DIRECTIONS
+SLIDER_DIRECTIONS[bitboard.BISHOP] = bitboard.BISHOP_DIRECTIONS
+SLIDER_DIRECTIONS[bitboard.QUEEN] = bitboard.ROOK_DIRECTIONS + bitboard.BISHOP_DIRECTIONS
 
 class ChessGame:
-    def __init__(self):
+    def __init__(self, backend: str = "array"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown board backend {backend!r}; expected one of {BACKENDS}")
+        self.backend = backend
+        self.bitboards: Optional[bitboard.BitboardBoard] = None
         self.board = self.initialize_board()
         self.current_player = Color.WHITE
         self.game_over = False
@@ -51,18 +136,200 @@ class ChessGame:
         self.check_status = {"white": False, "black": False}
         self.captured_pieces = {"white": [], "black": []}
         self.last_move_notation: Optional[str] = None
-    
+        # FEN-style castling rights ("KQkq") and the square a pawn may capture onto en passant
+        self.castling_rights = "KQkq"
+        self.en_passant: Optional[Tuple[int, int]] = None
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        # Standard algebraic notation of each move since start_fen, for PGN export
+        self.san_history: List[str] = []
+        self.start_fen = STARTING_FEN
+        self.undo_stack: List[MoveRecord] = []
+        # Kept up to date by set_squares so check detection never has to scan the board
+        self.king_squares: Dict[Color, Tuple[int, int]] = {}
+        self.piece_squares: Dict[Color, Set[Tuple[int, int]]] = {}
+        # attack_maps[color][row * 8 + col] counts color's pieces attacking that square (array backend)
+        self.attack_maps: Optional[Dict[Color, List[int]]] = None
+        self.ai_strength = "Medium"
+        self.last_search: Optional[SearchResult] = None
+        self.transposition_table = TranspositionTable()
+        # Piece-placement Zobrist hash, and position_key() of every position before the current one
+        self.zobrist_hash = 0
+        self.key_history: List[int] = []
+        self.sync_backend()
+
+    def set_backend(self, backend: str):
+        """Switch move generation to another backend, keeping the current position"""
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown board backend {backend!r}; expected one of {BACKENDS}")
+        self.backend = backend
+        self.sync_backend()
+
+    def sync_backend(self):
+        """Rebuild backend data structures, piece lists and attack maps from self.board"""
+        self.king_squares = {}
+        self.piece_squares = {Color.WHITE: set(), Color.BLACK: set()}
+        self.bitboards = bitboard.BitboardBoard() if self.backend == "bitboard" else None
+        self.attack_maps = None
+        self.zobrist_hash = 0
+        for row in range(8):
+            for col in range(8):
+                piece = self.board[row][col]
+                if not piece:
+                    continue
+                self.zobrist_hash ^= ZOBRIST_CODE_KEYS[piece.code][row * 8 + col]
+                self.piece_squares[piece.color].add((row, col))
+                if piece.kind == bitboard.KING:
+                    self.king_squares[piece.color] = (row, col)
+                if self.bitboards is not None:
+                    self.bitboards.put(*divmod(piece.code, 6), row * 8 + col)
+
+        if self.backend == "array":
+            self.attack_maps = {Color.WHITE: [0] * 64, Color.BLACK: [0] * 64}
+            for color, squares in self.piece_squares.items():
+                for row, col in squares:
+                    self.add_attacks(self.board[row][col], row, col, 1)
+
+    def piece_attacks(self, row: int, col: int, piece: Piece) -> List[Tuple[int, int]]:
+        """Squares attacked by a piece on the current board (sliders stop at the first piece)"""
+        kind = piece.kind
+        if kind == bitboard.PAWN:
+            direction = -1 if piece.color == Color.WHITE else 1
+            return [(row + direction, col + dc) for dc in (-1, 1)
+                    if self.is_valid_position(row + direction, col + dc)]
+        if kind == bitboard.KNIGHT or kind == bitboard.KING:
+            offsets = bitboard.KNIGHT_OFFSETS if kind == bitboard.KNIGHT else bitboard.KING_OFFSETS
+            return [(row + dr, col + dc) for dr, dc in offsets if self.is_valid_position(row + dr, col + dc)]
+
+        squares = []
+        for dr, dc in SLIDER_DIRECTIONS[kind]:
+            r, c = row + dr, col + dc
+            while 0 <= r < 8 and 0 <= c < 8:
+                squares.append((r, c))
+                if self.board[r][c] is not None:
+                    break
+                r, c = r + dr, c + dc
+        return squares
+
+    def add_attacks(self, piece: Piece, row: int, col: int, delta: int):
+        """Add (delta=1) or remove (delta=-1) a piece's attacks from its color's attack map"""
+        attack_map = self.attack_maps[piece.color]
+        for r, c in self.piece_attacks(row, col, piece):
+            attack_map[r * 8 + c] += delta
+
+    def sliders_attacking(self, row: int, col: int) -> List[Tuple[Piece, int, int]]:
+        """Rooks, bishops and queens whose line of attack reaches (row, col)"""
+        sliders = []
+        for dr, dc in SLIDER_DIRECTIONS[bitboard.QUEEN]:
+            r, c = row + dr, col + dc
+            while 0 <= r < 8 and 0 <= c < 8:
+                piece = self.board[r][c]
+                if piece is not None:
+                    # The attacker must move along (-dr, -dc) to get back to (row, col)
+                    directions = SLIDER_DIRECTIONS[piece.kind]
+                    if directions is not None and (-dr, -dc) in directions:
+                        sliders.append((piece, r, c))
+                    break
+                r, c = r + dr, c + dc
+        return sliders
+
+    def set_squares(self, changes: List[Tuple[int, int, Optional[Piece]]]):
+        """Write pieces to squares, updating king squares, piece lists and attack maps incrementally
+
+        Only pieces standing on a changed square and sliders whose lines pass through one can
+        gain or lose attacks, so just those are taken off the attack maps and put back.
+        """
+        affected: Dict[int, Tuple[Piece, int, int]] = {}
+        if self.attack_maps is not None:
+            for row, col, _ in changes:
+                occupant = self.board[row][col]
+                if occupant is not None:
+                    affected[id(occupant)] = (occupant, row, col)
+                for slider, r, c in self.sliders_attacking(row, col):
+                    affected[id(slider)] = (slider, r, c)
+            for piece, row, col in affected.values():
+                self.add_attacks(piece, row, col, -1)
+
+        bitboards = self.bitboards
+        for row, col, _ in changes:
+            occupant = self.board[row][col]
+            if occupant is not None:
+                self.piece_squares[occupant.color].discard((row, col))
+                self.zobrist_hash ^= ZOBRIST_CODE_KEYS[occupant.code][row * 8 + col]
+                if bitboards is not None:
+                    bitboards.remove(row * 8 + col)
+        for row, col, piece in changes:
+            self.board[row][col] = piece
+            if piece is not None:
+                self.piece_squares[piece.color].add((row, col))
+                self.zobrist_hash ^= ZOBRIST_CODE_KEYS[piece.code][row * 8 + col]
+                if bitboards is not None:
+                    bitboards.put(*divmod(piece.code, 6), row * 8 + col)
+                if piece.kind == bitboard.KING:
+                    self.king_squares[piece.color] = (row, col)
+
+        if self.attack_maps is not None:
+            changed = set()
+            for row, col, piece in changes:
+                changed.add((row, col))
+                if piece is not None:
+                    self.add_attacks(piece, row, col, 1)
+            for piece, row, col in affected.values():
+                if (row, col) not in changed:
+                    self.add_attacks(piece, row, col, 1)
+
     def get_all_legal_moves(self) -> List[Tuple[int, int, int, int]]:
         """Return a list of all legal moves for the current player as (from_row, from_col, to_row, to_col)."""
+        if self.bitboards is not None:
+            return [(f >> 3, f & 7, t >> 3, t & 7)
+                    for f, t in self.bitboards.legal_moves(COLOR_INDEX[self.current_player],
+                                                           self.en_passant_index(), self.castling_rights)]
         all_moves: List[Tuple[int, int, int, int]] = []
-        for row in range(8):
-            for col in range(8):
-                piece = self.get_piece(row, col)
-                if piece and piece.color == self.current_player:
-                    for to_row, to_col in self.get_possible_moves(row, col):
-                        all_moves.append((row, col, to_row, to_col))
+        # Sorted piece list keeps the row-major order of a full board scan
+        for row, col in sorted(self.piece_squares[self.current_player]):
+            for to_row, to_col in self.get_possible_moves(row, col):
+                all_moves.append((row, col, to_row, to_col))
         return all_moves
 
+    def captured_piece(self, move: Tuple[int, int, int, int]) -> Optional[Piece]:
+        """The piece a move would capture, including a pawn taken en passant"""
+        from_row, from_col, to_row, to_col = move
+        target = self.board[to_row][to_col]
+        if target is None and (to_row, to_col) == self.en_passant and \
+                self.board[from_row][from_col].kind == bitboard.PAWN:
+            return self.board[from_row][to_col]
+        return target
+
+    def get_legal_captures(self) -> List[Tuple[int, int, int, int]]:
+        """Legal capturing moves for the current player (the first stage of staged generation)"""
+        if self.bitboards is not None:
+            return [(f >> 3, f & 7, t >> 3, t & 7)
+                    for f, t in self.bitboards.legal_captures(COLOR_INDEX[self.current_player],
+                                                              self.en_passant_index())]
+        captures = []
+        for row, col in sorted(self.piece_squares[self.current_player]):
+            piece = self.board[row][col]
+            for to_row, to_col in self.MOVE_GENERATORS[piece.kind](self, row, col, piece):
+                move = (row, col, to_row, to_col)
+                if self.captured_piece(move) and self.is_legal_move(*move):
+                    captures.append(move)
+        return captures
+
+    def get_legal_quiet_moves(self) -> List[Tuple[int, int, int, int]]:
+        """Legal non-capturing moves for the current player, castling included"""
+        if self.bitboards is not None:
+            return [(f >> 3, f & 7, t >> 3, t & 7)
+                    for f, t in self.bitboards.legal_quiet_moves(COLOR_INDEX[self.current_player],
+                                                                 self.en_passant_index(), self.castling_rights)]
+        return [move for move in self.get_all_legal_moves() if not self.captured_piece(move)]
+
+    def has_legal_move(self) -> bool:
+        """Check if the current player has at least one legal move, stopping at the first"""
+        for row, col in sorted(self.piece_squares[self.current_player]):
+            if self.get_possible_moves(row, col):
+                return True
+        return False
+
     def get_all_legal_moves_for(self, color: Color) -> List[Tuple[int, int, int, int]]:
         """Return all legal moves for the specified color without changing turn state."""
         saved_player = self.current_player
@@ -71,51 +338,121 @@ class ChessGame:
         self.current_player = saved_player
         return moves
 
-    def autoplay(self, plies: int = 5) -> int:
-        """Play a given number of plies automatically by picking the first legal move each turn.
+    def promotion_choices(self, move: Tuple[int, int, int, int]) -> Tuple[Optional[PieceType], ...]:
+        """The promotion pieces a move can be played with, or (None,) if it is not a promotion"""
+        piece = self.board[move[0]][move[1]]
+        if piece.kind == bitboard.PAWN and move[2] in (0, 7):
+            return PROMOTION_TYPES
+        return (None,)
+
+    def perft(self, depth: int) -> int:
+        """Count the leaf nodes of the legal move tree `depth` plies deep from this position
+
+        Each promotion counts once per promotion piece, matching published perft tables.
+        """
+        if depth <= 0:
+            return 1
+        moves = self.get_all_legal_moves()
+        if depth == 1:
+            return sum(len(self.promotion_choices(move)) for move in moves)
+        nodes = 0
+        for move in moves:
+            for promotion in self.promotion_choices(move):
+                self.apply_move(move, promotion)
+                nodes += self.perft(depth - 1)
+                self.retract_move()
+        return nodes
+
+    def perft_divide(self, depth: int) -> Dict[str, int]:
+        """perft split by root move (e.g. "e2e4", "e7e8q"), for tracking down move generation bugs"""
+        counts = {}
+        for move in self.get_all_legal_moves():
+            for promotion in self.promotion_choices(move):
+                name = position_to_square(move[0], move[1]) + position_to_square(move[2], move[3])
+                if promotion is not None:
+                    name += FEN_LETTERS[promotion]
+                self.apply_move(move, promotion)
+                counts[name] = self.perft(depth - 1)
+                self.retract_move()
+        return counts
+
+    def autoplay(self, plies: int = 5, player: Optional[Player] = None) -> int:
+        """Play a given number of plies automatically, picking the first legal move each turn
+        unless another `player` strategy is given.
 
         Returns the number of plies actually played (can be fewer if no legal moves).
         """
+        player = player or FirstMovePlayer()
         played = 0
         for _ in range(plies):
-            if self.is_checkmate() or self.is_stalemate():
-                break
-            legal_moves = self.get_all_legal_moves()
-            if not legal_moves:
+            if self.is_checkmate() or self.is_stalemate() or self.is_threefold_repetition():
                 break
-            from_row, from_col, to_row, to_col = legal_moves[0]
             # make_move already validates using get_possible_moves and switches player
-            if not self.make_move(from_row, from_col, to_row, to_col):
+            if not self.ai_move_for(self.current_player, player=player):
                 break
             played += 1
         return played
 
     def ai_move(self) -> bool:
-        """Simple AI: if it's Black's turn, pick a random legal move and play it."""
-        if self.current_player != Color.BLACK:
-            return False
-        legal_moves = self.get_all_legal_moves()
-        if not legal_moves:
-            return False
-        from_row, from_col, to_row, to_col = random.choice(legal_moves)
-        moved = self.make_move(from_row, from_col, to_row, to_col)
-        if moved and self.move_history:
-            self.last_move_notation = self.move_history[-1]
-        return moved
+        """AI plays Black: if it's Black's turn, search for a move at ai_strength and play it."""
+        return self.ai_move_for(Color.BLACK)
+
+    def ai_move_for(self, color: Color, result: Optional[SearchResult] = None,
+                    player: Optional[Player] = None) -> bool:
+        """Pick a move for the given color at ai_strength if it's that color's turn.
 
-    def ai_move_for(self, color: Color) -> bool:
-        """Pick a random legal move for the given color if it's that color's turn."""
+        `result` is a search already finished for this position (e.g. by a background worker);
+        `player` replaces the ai_strength search with another strategy.
+        """
         if self.current_player != color:
             return False
-        legal_moves = self.get_all_legal_moves_for(color)
-        if not legal_moves:
+        if result is not None:
+            move, self.last_search = result.move, result
+        elif player is not None:
+            move, self.last_search = player.choose(self)
+            if move is None:
+                return False
+        else:
+            move, self.last_search = self.lookup_move()
+        if move is None:
+            move, self.last_search = choose_move(self, self.ai_strength, self.transposition_table)
+        if move is None:
             return False
-        from_row, from_col, to_row, to_col = random.choice(legal_moves)
+        from_row, from_col, to_row, to_col = move
         moved = self.make_move(from_row, from_col, to_row, to_col)
         if moved and self.move_history:
             self.last_move_notation = self.move_history[-1]
         return moved
 
+    def clone(self) -> "ChessGame":
+        """An independent copy of the position and its repetition history, e.g. for searching on another thread"""
+        copy = ChessGame(backend=self.backend)
+        copy.load_fen(self.to_fen())
+        copy.key_history = list(self.key_history)
+        copy.ai_strength = self.ai_strength
+        return copy
+
+    def lookup_move(self) -> Tuple[Optional[Tuple[int, int, int, int]], Optional[SearchResult]]:
+        """An instant move from the opening book or the KQK/KRK tables, if the position is covered
+
+        The Random level always plays randomly, so it skips both.
+        """
+        if STRENGTH_LEVELS[self.ai_strength] is None:
+            return None, None
+        return self.known_move()
+
+    def known_move(self) -> Tuple[Optional[Tuple[int, int, int, int]], Optional[SearchResult]]:
+        """The opening book's or endgame tables' move for this position, or (None, None)"""
+        start = time.perf_counter()
+        book = default_book()
+        move = book.choose(self) if book is not None else None
+        if move is not None:
+            return move, SearchResult(move, 0, 0, 0, time.perf_counter() - start, "book")
+        move, score = chess_endgame.best_move(self)
+        if move is not None:
+            return move, SearchResult(move, score, 0, 0, time.perf_counter() - start, "endgame table")
+        return None, None
+
     def initialize_board(self) -> List[List[Optional[Piece]]]:
         """Initialize the chess board with pieces in starting positions"""
         board = [[None for _ in range(8)] for _ in range(8)]
@@ -150,21 +487,12 @@ class ChessGame:
         piece = self.get_piece(row, col)
         if not piece or piece.color != self.current_player:
             return []
-        
-        moves = []
-        
-        if piece.type == PieceType.PAWN:
-            moves = self.get_pawn_moves(row, col, piece)
-        elif piece.type == PieceType.ROOK:
-            moves = self.get_rook_moves(row, col, piece)
-        elif piece.type == PieceType.KNIGHT:
-            moves = self.get_knight_moves(row, col, piece)
-        elif piece.type == PieceType.BISHOP:
-            moves = self.get_bishop_moves(row, col, piece)
-        elif piece.type == PieceType.QUEEN:
-            moves = self.get_queen_moves(row, col, piece)
-        elif piece.type == PieceType.KING:
-            moves = self.get_king_moves(row, col, piece)
+
+        if self.bitboards is not None:
+            return [(t >> 3, t & 7) for t in self.bitboards.legal_targets(
+                row * 8 + col, self.en_passant_index(), self.castling_rights)]
+
+        moves = self.MOVE_GENERATORS[piece.kind](self, row, col, piece)
         
         # Filter out moves that would put own king in check
         valid_moves = []
@@ -188,12 +516,13 @@ class ChessGame:
             if row == start_row and not self.get_piece(row + 2 * direction, col):
                 moves.append((row + 2 * direction, col))
         
-        # Capture diagonally
+        # Capture diagonally, including en passant onto the square a pawn just skipped
         for dc in [-1, 1]:
             new_row, new_col = row + direction, col + dc
-            if (self.is_valid_position(new_row, new_col) and 
-                self.get_piece(new_row, new_col) and 
-                self.get_piece(new_row, new_col).color != piece.color):
+            if (self.is_valid_position(new_row, new_col) and
+                ((self.get_piece(new_row, new_col) and
+                  self.get_piece(new_row, new_col).color != piece.color) or
+                 (new_row, new_col) == self.en_passant)):
                 moves.append((new_row, new_col))
         
         return moves
@@ -271,30 +600,169 @@ class ChessGame:
                 (not self.get_piece(new_row, new_col) or 
                  self.get_piece(new_row, new_col).color != piece.color)):
                 moves.append((new_row, new_col))
-        
+
+        return moves + self.get_castling_moves(row, col, piece)
+
+    def get_castling_moves(self, row: int, col: int, piece: Piece) -> List[Tuple[int, int]]:
+        """Castling as the king's two-square move, when the rights, empty squares and safe path allow"""
+        moves = []
+        opponent = self.opponent(piece.color)
+        for right, color, king_row, rook_col, target_col, empty_cols, path_cols in CASTLING_RULES:
+            if right not in self.castling_rights or color != piece.color or (row, col) != (king_row, 4):
+                continue
+            rook = self.board[king_row][rook_col]
+            if not rook or rook.type != PieceType.ROOK or rook.color != color:
+                continue
+            if any(self.board[king_row][c] is not None for c in empty_cols):
+                continue
+            if any(self.is_square_under_attack(king_row, c, opponent, self.board) for c in path_cols):
+                continue
+            moves.append((king_row, target_col))
         return moves
-    
+
+    # Pseudo-legal move generators indexed by Piece.kind
+    MOVE_GENERATORS = (get_pawn_moves, get_knight_moves, get_bishop_moves,
+                       get_rook_moves, get_queen_moves, get_king_moves)
+
     def is_legal_move(self, from_row: int, from_col: int, to_row: int, to_col: int) -> bool:
         """Check if a move is legal (doesn't put own king in check)"""
-        # Make a copy of the board
-        temp_board = copy.deepcopy(self.board)
-        
-        # Make the move
-        piece = temp_board[from_row][from_col]
-        temp_board[to_row][to_col] = piece
-        temp_board[from_row][from_col] = None
-        
-        # Check if own king is in check
-        king_pos = self.find_king(self.current_player, temp_board)
+        if self.get_piece(from_row, from_col) is None:
+            return False
+        if self.bitboards is not None:
+            return self.bitboards.leaves_king_safe(from_row * 8 + from_col, to_row * 8 + to_col,
+                                                   self.en_passant_index())
+
+        # Play the move in place, look up the king on the updated attack map, then take it back
+        self.push_move(from_row, from_col, to_row, to_col)
+        king_pos = self.king_squares.get(self.current_player)
+        legal = True
         if king_pos:
-            return not self.is_square_under_attack(king_pos[0], king_pos[1], 
-                                                 Color.BLACK if self.current_player == Color.WHITE else Color.WHITE, 
-                                                 temp_board)
-        
-        return True
+            legal = not self.is_square_under_attack(king_pos[0], king_pos[1],
+                                                    self.opponent(self.current_player), self.board)
+        self.pop_move()
+        return legal
+
+    def push_move(self, from_row: int, from_col: int, to_row: int, to_col: int,
+                  promotion: Optional[PieceType] = None) -> MoveRecord:
+        """Move a piece on the board without validation and push an undo record
+
+        Handles en passant, castling (a king moving two squares brings its rook along) and
+        promotion, which defaults to a queen.
+        """
+        piece = self.board[from_row][from_col]
+        captured = self.board[to_row][to_col]
+        captured_square = (to_row, to_col)
+        changes: Dict[Tuple[int, int], Optional[Piece]] = {(from_row, from_col): None}
+        rook_move = None
+        promoted = None
+        if piece.kind == bitboard.PAWN:
+            if captured is None and from_col != to_col:
+                captured_square = (from_row, to_col)
+                captured = self.board[from_row][to_col]
+                changes[captured_square] = None
+            if to_row in (0, 7):
+                promoted = Piece(promotion or PieceType.QUEEN, piece.color)
+                promoted.has_moved = True
+        elif piece.kind == bitboard.KING and abs(to_col - from_col) == 2:
+            rook_from, rook_to = (7, 5) if to_col > from_col else (0, 3)
+            # Remember what stood on the rook's target: pseudo-legal probes can "castle" onto a piece
+            rook_move = (from_row, rook_from, rook_to, self.board[from_row][rook_to])
+            changes[(from_row, rook_from)] = None
+            changes[(from_row, rook_to)] = self.board[from_row][rook_from]
+        changes[(to_row, to_col)] = promoted or piece
+
+        record = MoveRecord(from_row, from_col, to_row, to_col, piece, captured, piece.has_moved,
+                            captured_square, rook_move, promoted, self.castling_rights, self.en_passant,
+                            self.halfmove_clock)
+        self.key_history.append(self.position_key())
+        self.set_squares([(r, c, p) for (r, c), p in changes.items()])
+        piece.has_moved = True
+
+        rights = self.castling_rights
+        for square in ((from_row, from_col), (to_row, to_col)):
+            if square in CASTLING_SQUARES:
+                rights = "".join(r for r in rights if r not in CASTLING_SQUARES[square])
+        self.castling_rights = rights
+        if piece.kind == bitboard.PAWN and abs(to_row - from_row) == 2:
+            self.en_passant = ((from_row + to_row) // 2, from_col)
+        else:
+            self.en_passant = None
+        self.halfmove_clock = 0 if piece.kind == bitboard.PAWN or captured else self.halfmove_clock + 1
+        if piece.color == Color.BLACK:
+            self.fullmove_number += 1
+
+        self.undo_stack.append(record)
+        return record
+
+    def apply_move(self, move: Tuple[int, int, int, int], promotion: Optional[PieceType] = None):
+        """Play a legal move in place and pass the turn, without history or notation (search/perft)"""
+        self.push_move(*move, promotion=promotion)
+        self.current_player = self.opponent(self.current_player)
+
+    def retract_move(self):
+        """Undo the last apply_move and give the turn back"""
+        self.current_player = self.pop_move().piece.color
+
+    def position_key(self) -> int:
+        """Zobrist hash of the position: piece placement, side to move, castling rights and en passant file"""
+        key = self.zobrist_hash
+        if self.current_player == Color.BLACK:
+            key ^= ZOBRIST_BLACK_TO_MOVE
+        for right in self.castling_rights:
+            key ^= ZOBRIST_CASTLING[right]
+        if self.en_passant is not None:
+            key ^= ZOBRIST_EN_PASSANT_FILE[self.en_passant[1]]
+        return key
+
+    def en_passant_index(self) -> Optional[int]:
+        """The en passant square as a bitboard square index"""
+        if self.en_passant is None:
+            return None
+        return self.en_passant[0] * 8 + self.en_passant[1]
+
+    def repetition_count(self) -> int:
+        """How many times the current position has occurred, including now"""
+        key = self.position_key()
+        return 1 + sum(1 for earlier in self.key_history if earlier == key)
+
+    def is_threefold_repetition(self) -> bool:
+        return self.repetition_count() >= 3
+
+    def is_repetition(self) -> bool:
+        """Check if the current position occurred before (used by search to score draws)"""
+        key = self.position_key()
+        # Positions with the same side to move sit an even number of plies back
+        return key in self.key_history[-2::-2]
+
+    def in_check(self, color: Color) -> bool:
+        king = self.king_squares.get(color)
+        return bool(king) and self.is_square_under_attack(king[0], king[1], self.opponent(color), self.board)
+
+    def pop_move(self) -> MoveRecord:
+        """Take back the last pushed move, restoring any captured piece"""
+        record = self.undo_stack.pop()
+        self.key_history.pop()
+        changes: Dict[Tuple[int, int], Optional[Piece]] = {(record.to_row, record.to_col): None}
+        if record.captured:
+            changes[record.captured_square] = record.captured
+        if record.rook_move:
+            row, rook_from, rook_to, displaced = record.rook_move
+            changes[(row, rook_to)] = displaced
+            changes[(row, rook_from)] = self.board[row][rook_to]
+        changes[(record.from_row, record.from_col)] = record.piece
+        self.set_squares([(r, c, p) for (r, c), p in changes.items()])
+        record.piece.has_moved = record.had_moved
+        self.castling_rights = record.castling_rights
+        self.en_passant = record.en_passant
+        self.halfmove_clock = record.halfmove_clock
+        if record.piece.color == Color.BLACK:
+            self.fullmove_number -= 1
+        return record
     
     def find_king(self, color: Color, board: List[List[Optional[Piece]]]) -> Optional[Tuple[int, int]]:
         """Find the position of the king of given color"""
+        if board is self.board:
+            return self.king_squares.get(color)
         for row in range(8):
             for col in range(8):
                 piece = board[row][col]
@@ -304,6 +772,11 @@ class ChessGame:
     
     def is_square_under_attack(self, row: int, col: int, attacking_color: Color, board: List[List[Optional[Piece]]]) -> bool:
         """Check if a square is under attack by the given color"""
+        if board is self.board:
+            if self.attack_maps is not None:
+                return self.attack_maps[attacking_color][row * 8 + col] > 0
+            if self.bitboards is not None:
+                return self.bitboards.is_attacked(row * 8 + col, COLOR_INDEX[attacking_color])
         for r in range(8):
             for c in range(8):
                 piece = board[r][c]
@@ -370,32 +843,32 @@ class ChessGame:
         
         return True
     
-    def make_move(self, from_row: int, from_col: int, to_row: int, to_col: int) -> bool:
-        """Make a move on the board"""
-        if not self.is_legal_move(from_row, from_col, to_row, to_col):
-            return False
-        
+    def make_move(self, from_row: int, from_col: int, to_row: int, to_col: int,
+                  promotion: Optional[PieceType] = None) -> bool:
+        """Make a move on the board (pawns reaching the last rank promote to `promotion`, default queen)"""
         piece = self.get_piece(from_row, from_col)
         if not piece or piece.color != self.current_player:
             return False
         
-        # Check if move is in possible moves
+        # Check if move is in possible moves (which are already filtered for legality), before
+        # anything is played on the board
         possible_moves = self.get_possible_moves(from_row, from_col)
         if (to_row, to_col) not in possible_moves:
             return False
         
-        # Capture piece if present
-        captured_piece = self.get_piece(to_row, to_col)
+        if not self.san_history:
+            self.start_fen = self.to_fen()
+        san = self.get_san(from_row, from_col, to_row, to_col, promotion)
+
+        # Make the move, capturing any piece on the target square
+        record = self.push_move(from_row, from_col, to_row, to_col, promotion)
+        captured_piece = record.captured
         if captured_piece:
             self.captured_pieces[captured_piece.color.value].append(captured_piece)
         
-        # Make the move
-        self.board[to_row][to_col] = piece
-        self.board[from_row][from_col] = None
-        piece.has_moved = True
-        
         # Record move
-        move_notation = self.get_move_notation(from_row, from_col, to_row, to_col, piece, captured_piece)
+        move_notation = self.get_move_notation(from_row, from_col, to_row, to_col, piece, captured_piece,
+                                               record.promoted)
         self.move_history.append(move_notation)
         self.last_move_notation = move_notation
         
@@ -404,65 +877,102 @@ class ChessGame:
         
         # Check for check/checkmate
         self.update_check_status()
+        if self.check_status[self.current_player.value]:
+            san += "+" if self.has_legal_move() else "#"
+        self.san_history.append(san)
         
         return True
+
+    def undo_move(self) -> bool:
+        """Take back the last move made with make_move"""
+        if not self.undo_stack:
+            return False
+        record = self.pop_move()
+        if record.captured:
+            self.captured_pieces[record.captured.color.value].pop()
+        if self.move_history:
+            self.move_history.pop()
+        if self.san_history:
+            self.san_history.pop()
+        self.last_move_notation = self.move_history[-1] if self.move_history else None
+        self.current_player = record.piece.color
+        self.game_over = False
+        self.winner = None
+        self.selected_square = None
+        self.possible_moves = []
+        self.update_check_status()
+        return True
     
     def get_move_notation(self, from_row: int, from_col: int, to_row: int, to_col: int, 
-                         piece: Piece, captured_piece: Optional[Piece]) -> str:
+                         piece: Piece, captured_piece: Optional[Piece],
+                         promoted: Optional[Piece] = None) -> str:
         """Get algebraic notation for a move"""
         files = "abcdefgh"
         ranks = "87654321"
         
         from_square = files[from_col] + ranks[from_row]
         to_square = files[to_col] + ranks[to_row]
-        
+
+        if piece.type == PieceType.KING and abs(to_col - from_col) == 2:
+            return f"{piece.symbol} {'O-O' if to_col > from_col else 'O-O-O'}"
+        suffix = f"={promoted.symbol}" if promoted else ""
         if captured_piece:
-            return f"{piece.get_symbol()} {from_square}x{to_square}"
+            return f"{piece.symbol} {from_square}x{to_square}{suffix}"
         else:
-            return f"{piece.get_symbol()} {from_square}-{to_square}"
+            return f"{piece.symbol} {from_square}-{to_square}{suffix}"
     
+    def get_san(self, from_row: int, from_col: int, to_row: int, to_col: int,
+                promotion: Optional[PieceType] = None) -> str:
+        """Standard algebraic notation for a legal move about to be played, without the check suffix"""
+        piece = self.board[from_row][from_col]
+        target = position_to_square(to_row, to_col)
+        if piece.type == PieceType.KING and abs(to_col - from_col) == 2:
+            return "O-O" if to_col > from_col else "O-O-O"
+        is_capture = self.board[to_row][to_col] is not None or (
+            piece.type == PieceType.PAWN and from_col != to_col)
+        if piece.type == PieceType.PAWN:
+            san = f"{'abcdefgh'[from_col]}x{target}" if is_capture else target
+            if to_row in (0, 7):
+                san += "=" + FEN_LETTERS[promotion or PieceType.QUEEN].upper()
+            return san
+
+        # Disambiguate by file, then rank, then both when another piece of the same type can also move there
+        rivals = [(row, col) for row, col in self.piece_squares[piece.color]
+                  if (row, col) != (from_row, from_col) and self.board[row][col].type == piece.type
+                  and (to_row, to_col) in self.get_possible_moves(row, col)]
+        origin = ""
+        if rivals:
+            from_square = position_to_square(from_row, from_col)
+            if all(col != from_col for _, col in rivals):
+                origin = from_square[0]
+            elif all(row != from_row for row, _ in rivals):
+                origin = from_square[1]
+            else:
+                origin = from_square
+        return f"{FEN_LETTERS[piece.type].upper()}{origin}{'x' if is_capture else ''}{target}"
+
     def update_check_status(self):
         """Update check status for both players"""
-        white_king = self.find_king(Color.WHITE, self.board)
-        black_king = self.find_king(Color.BLACK, self.board)
-        
-        if white_king:
-            self.check_status["white"] = self.is_square_under_attack(
-                white_king[0], white_king[1], Color.BLACK, self.board)
-        
-        if black_king:
-            self.check_status["black"] = self.is_square_under_attack(
-                black_king[0], black_king[1], Color.WHITE, self.board)
+        for color in (Color.WHITE, Color.BLACK):
+            king = self.king_squares.get(color)
+            if king:
+                self.check_status[color.value] = self.is_square_under_attack(
+                    king[0], king[1], self.opponent(color), self.board)
     
+    def opponent(self, color: Color) -> Color:
+        return Color.BLACK if color == Color.WHITE else Color.WHITE
+
     def is_checkmate(self) -> bool:
         """Check if current player is in checkmate"""
         if not self.check_status[self.current_player.value]:
             return False
-        
-        # Check if any legal moves exist
-        for row in range(8):
-            for col in range(8):
-                piece = self.get_piece(row, col)
-                if piece and piece.color == self.current_player:
-                    if self.get_possible_moves(row, col):
-                        return False
-        
-        return True
+        return not self.has_legal_move()
     
     def is_stalemate(self) -> bool:
         """Check if current player is in stalemate"""
         if self.check_status[self.current_player.value]:
             return False
-        
-        # Check if any legal moves exist
-        for row in range(8):
-            for col in range(8):
-                piece = self.get_piece(row, col)
-                if piece and piece.color == self.current_player:
-                    if self.get_possible_moves(row, col):
-                        return False
-        
-        return True
+        return not self.has_legal_move()
     
     def reset_game(self):
         """Reset the game to initial state"""
@@ -475,6 +985,233 @@ class ChessGame:
         self.possible_moves = []
         self.check_status = {"white": False, "black": False}
         self.captured_pieces = {"white": [], "black": []}
+        self.castling_rights = "KQkq"
+        self.en_passant = None
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.san_history = []
+        self.start_fen = STARTING_FEN
+        self.last_move_notation = None
+        self.last_search = None
+        self.undo_stack = []
+        self.key_history = []
+        self.transposition_table.clear()
+        self.sync_backend()
+
+    def load_fen(self, fen: str):
+        """Start a fresh game from the position in a FEN string"""
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError(f"Invalid FEN {fen!r}: expected at least 4 fields")
+        placement, side, castling, en_passant = fields[:4]
+        rows = placement.split("/")
+        if len(rows) != 8 or side not in ("w", "b"):
+            raise ValueError(f"Invalid FEN {fen!r}")
+
+        board: List[List[Optional[Piece]]] = [[None] * 8 for _ in range(8)]
+        for row, text in enumerate(rows):
+            col = 0
+            for char in text:
+                if char.isdigit():
+                    col += int(char)
+                    continue
+                if char.lower() not in FEN_PIECE_TYPES or col > 7:
+                    raise ValueError(f"Invalid FEN {fen!r}: bad rank {text!r}")
+                piece = Piece(FEN_PIECE_TYPES[char.lower()], Color.WHITE if char.isupper() else Color.BLACK)
+                if piece.type == PieceType.PAWN:
+                    piece.has_moved = row != (6 if piece.color == Color.WHITE else 1)
+                board[row][col] = piece
+                col += 1
+            if col != 8:
+                raise ValueError(f"Invalid FEN {fen!r}: bad rank {text!r}")
+
+        try:
+            halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+            fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+        except ValueError:
+            raise ValueError(f"Invalid FEN {fen!r}: bad move counters") from None
+        self.set_position(board, Color.WHITE if side == "w" else Color.BLACK, castling,
+                          None if en_passant == "-" else square_to_position(en_passant),
+                          halfmove_clock, fullmove_number)
+
+    def set_position(self, board: List[List[Optional[Piece]]], player: Color, castling_rights: str,
+                     en_passant: Optional[Tuple[int, int]], halfmove_clock: int = 0, fullmove_number: int = 1):
+        """Start a fresh game from an arbitrary position"""
+        for row, rank in enumerate(board):
+            for piece in rank:
+                if piece and piece.type == PieceType.PAWN:
+                    piece.has_moved = row != (6 if piece.color == Color.WHITE else 1)
+        self.reset_game()
+        self.board = board
+        self.current_player = player
+        self.castling_rights = "".join(r for r in "KQkq" if r in castling_rights)
+        self.en_passant = en_passant
+        self.halfmove_clock = halfmove_clock
+        self.fullmove_number = fullmove_number
+        self.sync_backend()
+        self.start_fen = self.to_fen()
+        self.update_check_status()
+
+    def to_fen(self) -> str:
+        """The current position as a FEN string"""
+        ranks = []
+        for rank in self.board:
+            text, empty = "", 0
+            for piece in rank:
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                letter = FEN_LETTERS[piece.type]
+                text += letter.upper() if piece.color == Color.WHITE else letter
+            ranks.append(text + (str(empty) if empty else ""))
+        en_passant = position_to_square(*self.en_passant) if self.en_passant else "-"
+        return (f"{'/'.join(ranks)} {'w' if self.current_player == Color.WHITE else 'b'} "
+                f"{self.castling_rights or '-'} {en_passant} {self.halfmove_clock} {self.fullmove_number}")
+
+    def game_result(self) -> str:
+        """PGN result tag: 1-0, 0-1, 1/2-1/2, or * while the game is still going"""
+        if self.is_checkmate():
+            return "0-1" if self.current_player == Color.WHITE else "1-0"
+        if self.is_stalemate() or self.is_threefold_repetition():
+            return "1/2-1/2"
+        return "*"
+
+    def to_pgn(self, white: str = "White", black: str = "Black", event: str = "Casual Game",
+               result: Optional[str] = None) -> str:
+        """The game so far as PGN, with SetUp/FEN tags when it did not start from the initial position
+
+        `result` overrides the result tag, e.g. for games adjudicated by the caller.
+        """
+        result = result or self.game_result()
+        tags = [("Event", event), ("Site", "?"), ("Date", "????.??.??"), ("Round", "?"),
+                ("White", white), ("Black", black), ("Result", result)]
+        if self.start_fen != STARTING_FEN:
+            tags += [("SetUp", "1"), ("FEN", self.start_fen)]
+        header = "\n".join(f'[{name} "{value}"]' for name, value in tags)
+
+        start_fields = self.start_fen.split()
+        move_number = int(start_fields[5])
+        black_to_move = start_fields[1] == "b"
+        tokens = []
+        for san in self.san_history:
+            if not black_to_move:
+                tokens.append(f"{move_number}.")
+            elif not tokens:
+                tokens.append(f"{move_number}...")
+            tokens.append(san)
+            if black_to_move:
+                move_number += 1
+            black_to_move = not black_to_move
+        tokens.append(result)
+
+        # Wrap movetext at 80 columns as the PGN export format asks
+        lines, line = [], ""
+        for token in tokens:
+            if line and len(line) + 1 + len(token) > 80:
+                lines.append(line)
+                line = token
+            else:
+                line = f"{line} {token}" if line else token
+        lines.append(line)
+        return header + "\n\n" + "\n".join(lines) + "\n"
+
+    def to_packed(self) -> bytes:
+        """The current position in the fixed-size PACKED_POSITION binary format"""
+        occupancy = 0
+        codes = []
+        for square in range(64):
+            piece = self.board[square >> 3][square & 7]
+            if piece is not None:
+                occupancy |= 1 << square
+                codes.append(piece.code)
+        if len(codes) > 32:
+            raise ValueError("Positions with more than 32 pieces cannot be packed")
+        codes += [0] * (32 - len(codes))
+        nibbles = bytes((codes[i] << 4) | codes[i + 1] for i in range(0, 32, 2))
+        flags = int(self.current_player == Color.BLACK)
+        for bit, right in enumerate("KQkq", 1):
+            if right in self.castling_rights:
+                flags |= 1 << bit
+        en_passant = self.en_passant[1] + 1 if self.en_passant else 0
+        return PACKED_POSITION.pack(occupancy, nibbles, flags, en_passant,
+                                    min(self.halfmove_clock, 255), self.fullmove_number)
+
+    def load_packed(self, data: bytes):
+        """Start a fresh game from a position produced by to_packed"""
+        if len(data) != PACKED_POSITION.size:
+            raise ValueError(f"Packed position must be {PACKED_POSITION.size} bytes, got {len(data)}")
+        occupancy, nibbles, flags, en_passant, halfmove_clock, fullmove_number = PACKED_POSITION.unpack(data)
+        codes = [code for byte in nibbles for code in (byte >> 4, byte & 15)]
+        board: List[List[Optional[Piece]]] = [[None] * 8 for _ in range(8)]
+        index = 0
+        for square in range(64):
+            if occupancy >> square & 1:
+                color, type_index = divmod(codes[index], 6)
+                if color > 1:
+                    raise ValueError(f"Invalid piece code {codes[index]} in packed position")
+                board[square >> 3][square & 7] = Piece(PIECE_TYPE_ORDER[type_index],
+                                                       Color.BLACK if color else Color.WHITE)
+                index += 1
+        player = Color.BLACK if flags & 1 else Color.WHITE
+        castling = "".join(right for bit, right in enumerate("KQkq", 1) if flags >> bit & 1)
+        # The en passant rank follows from the side to move
+        en_passant_square = (2 if player == Color.WHITE else 5, en_passant - 1) if en_passant else None
+        self.set_position(board, player, castling, en_passant_square, halfmove_clock, fullmove_number)
+
+def play_typed_move(game: ChessGame):
+    """Move input for the HTML board: White's move in coordinates, e.g. e2e4, e2-e4 or e7e8q"""
+    with st.form("typed_move", clear_on_submit=True):
+        text = st.text_input("Your move", key="typed_move_text", placeholder="e2e4")
+        submitted = st.form_submit_button("Move")
+    if not submitted or not text.strip():
+        return
+    if game.current_player != Color.WHITE:
+        st.info("Wait for Black (AI) to play; it's not White's turn.")
+        return
+    move = text.strip().lower().replace("-", "")
+    start, end = square_to_position(move[:2]), square_to_position(move[2:4])
+    promotion = FEN_PIECE_TYPES.get(move[4:])
+    if start is None or end is None or len(move) > 5 or (len(move) == 5 and promotion not in PROMOTION_TYPES):
+        st.error(f"Can't read move {text.strip()!r}; use coordinates like e2e4.")
+        return
+    if not game.make_move(*start, *end, promotion=promotion):
+        st.error(f"{text.strip()} is not a legal move.")
+        return
+    if not (game.is_checkmate() or game.is_stalemate() or game.is_threefold_repetition()):
+        st.session_state.ai_pending = Color.BLACK
+    st.rerun()
+
+
+def play_pending_ai_move(game: ChessGame, worker: AIWorker):
+    """Play the background search result for the AI's pending move once it is ready, or ponder on White's turn"""
+    pending = st.session_state.ai_pending
+    game_over = game.is_checkmate() or game.is_stalemate() or game.is_threefold_repetition()
+    if pending is not None and (pending != game.current_player or game_over):
+        st.session_state.ai_pending = pending = None
+
+    if pending is None:
+        if game.current_player == Color.WHITE and not game_over and STRENGTH_LEVELS[game.ai_strength] is not None:
+            worker.ponder(game, game.ai_strength)
+        return
+
+    if STRENGTH_LEVELS[game.ai_strength] is None:
+        result = None  # a random move needs no search
+    else:
+        # Wait for the search in this run rather than rerunning the page until it is done; it
+        # ends on its own depth or time limit. think() queues it again if it was cancelled
+        result = worker.think(game, game.ai_strength)
+        if result is None:
+            with st.spinner("🤔 AI is thinking…"):
+                while result is None:
+                    result = (worker.wait(game, game.ai_strength, timeout=1.0)
+                              or worker.think(game, game.ai_strength))
+    st.session_state.ai_pending = None
+    game.ai_move_for(pending, result)
+    st.rerun()
+
 
 def main():
     st.set_page_config(
@@ -496,6 +1233,22 @@ def main():
         st.session_state.ai_opening_done = False
     if 'board_style' not in st.session_state:
         st.session_state.board_style = 'Classic'
+    if 'board_backend' not in st.session_state:
+        st.session_state.board_backend = 'Array'
+    if 'ai_strength' not in st.session_state:
+        st.session_state.ai_strength = 'Medium'
+    if 'board_render' not in st.session_state:
+        st.session_state.board_render = 'Buttons'
+    if 'board_renderer' not in st.session_state:
+        st.session_state.board_renderer = BoardRenderer()
+    # Finished AI searches by (position key, strength), filled by the background worker
+    if 'ai_cache' not in st.session_state:
+        st.session_state.ai_cache = {}
+    if 'ai_worker' not in st.session_state:
+        st.session_state.ai_worker = AIWorker(st.session_state.ai_cache)
+    # Color the AI has been asked to move for, while its search runs in the background
+    if 'ai_pending' not in st.session_state:
+        st.session_state.ai_pending = None
     
     game = st.session_state.chess_game
     
@@ -505,8 +1258,20 @@ def main():
         
         st.checkbox("Black starts (AI)", key="black_starts")
         st.selectbox("Board style", ["Classic", "Green", "Blue", "Dark"], key="board_style")
+        st.selectbox("Board rendering", ["Buttons", "HTML"], key="board_render",
+                     help="HTML draws the board as one cached fragment and takes typed moves, "
+                          "which is much lighter on slow connections than 64 buttons.")
+        st.selectbox("AI strength", list(STRENGTH_LEVELS), key="ai_strength",
+                     help="Search depth and time budget for AI moves; Random plays any legal move.")
+        game.ai_strength = st.session_state.ai_strength
+        st.selectbox("Move generator", ["Array", "Bitboard"], key="board_backend",
+                     help="Bitboard is much faster for autoplay; both produce the same moves.")
+        if game.backend != st.session_state.board_backend.lower():
+            game.set_backend(st.session_state.board_backend.lower())
         if st.button("🔄 New Game", key="new_game"):
             game.reset_game()
+            st.session_state.ai_worker.stop()
+            st.session_state.ai_pending = None
             # Respect Black starts setting
             if st.session_state.black_starts:
                 game.current_player = Color.BLACK
@@ -516,33 +1281,31 @@ def main():
             st.rerun()
         
         if st.button("↩️ Undo Move", key="undo"):
-            if len(game.move_history) > 0:
-                # Simple undo - just reset the game for now
-                # In a full implementation, you'd store board states
-                st.warning("Undo not fully implemented - starting new game")
-                game.reset_game()
-                if st.session_state.black_starts:
-                    game.current_player = Color.BLACK
-                    st.session_state.ai_opening_done = False
-                else:
+            if game.undo_move():
+                # Black is the AI, so also take back its reply and hand the turn to White
+                if game.current_player == Color.BLACK and game.move_history:
+                    game.undo_move()
+                if game.current_player == Color.BLACK:
                     st.session_state.ai_opening_done = False
+                st.session_state.selected_square = None
+                st.session_state.possible_moves = []
                 st.rerun()
 
         st.markdown("---")
-        st.subheader("🤖 Random Moves")
+        st.subheader("🤖 AI Moves")
         c1, c2 = st.columns(2)
         with c1:
-            if st.button("Random White move", key="rand_w"):
-                if game.ai_move_for(Color.WHITE):
-                    st.rerun()
+            if st.button("AI White move", key="rand_w") and game.current_player == Color.WHITE:
+                st.session_state.ai_pending = Color.WHITE
+                st.rerun()
         with c2:
-            if st.button("Random Black move", key="rand_b"):
-                if game.ai_move_for(Color.BLACK):
-                    st.rerun()
+            if st.button("AI Black move", key="rand_b") and game.current_player == Color.BLACK:
+                st.session_state.ai_pending = Color.BLACK
+                st.rerun()
         plies = st.slider("Autoplay plies (both)", min_value=1, max_value=20, value=4, step=1, key="autoplay_both_plies")
         if st.button("Play random plies (both)", key="rand_both"):
             for _ in range(plies):
-                if game.is_checkmate() or game.is_stalemate():
+                if game.is_checkmate() or game.is_stalemate() or game.is_threefold_repetition():
                     break
                 legal = game.get_all_legal_moves()
                 if not legal:
@@ -556,7 +1319,23 @@ def main():
             played = game.autoplay(plies=5)
             st.success(f"Autoplay made {played} plies")
             st.rerun()
-        
+
+        st.markdown("---")
+        st.subheader("💾 Position & PGN")
+        st.code(game.to_fen(), language=None)
+        fen = st.text_input("Load FEN", key="fen_input", placeholder="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        if st.button("Load position", key="load_fen") and fen.strip():
+            try:
+                game.load_fen(fen.strip())
+            except ValueError as error:
+                st.error(str(error))
+            else:
+                # A loaded position with Black to move is the AI's turn
+                st.session_state.ai_opening_done = False
+                st.rerun()
+        st.download_button("Download PGN", game.to_pgn(), file_name="chess_game.pgn",
+                           mime="application/x-chess-pgn", key="download_pgn")
+
         st.markdown("---")
         st.header("📊 Game Status")
         
@@ -564,6 +1343,12 @@ def main():
         color_name = "White" if game.current_player == Color.WHITE else "Black"
         st.markdown(f"**Current Player:** {current_player_emoji} {color_name}")
         st.caption("White moves first; Black is AI and plays after each White move.")
+        if game.last_search is not None and game.last_search.source != "search":
+            st.caption(f"Last AI move: from the {game.last_search.source}")
+        elif game.last_search is not None:
+            result = game.last_search
+            st.caption(f"Last search: depth {result.depth} • {result.nodes:,} nodes in "
+                       f"{result.elapsed:.2f}s ({result.nodes_per_second:,.0f} nodes/s)")
         
         if game.check_status["white"]:
             st.warning("⚪ White is in check!")
@@ -576,6 +1361,8 @@ def main():
             st.success(f"🏆 {winner} wins!")
         elif game.is_stalemate():
             st.info("Stalemate! Game is a draw!")
+        elif game.is_threefold_repetition():
+            st.info("Threefold repetition! Game is a draw!")
         
         st.markdown("---")
         st.header("📝 Move History")
@@ -591,11 +1378,11 @@ def main():
         with col1:
             st.markdown("**White Captured:**")
             for piece in game.captured_pieces["white"]:
-                st.text(piece.get_symbol())
+                st.text(piece.symbol)
         with col2:
             st.markdown("**Black Captured:**")
             for piece in game.captured_pieces["black"]:
-                st.text(piece.get_symbol())
+                st.text(piece.symbol)
     
     # Main game area
     col1, col2, col3 = st.columns([1, 3, 1])
@@ -605,9 +1392,8 @@ def main():
 
         # If Black should start and hasn't moved yet, make opening AI move
         if game.current_player == Color.BLACK and not st.session_state.ai_opening_done:
-            if game.ai_move():
-                st.session_state.ai_opening_done = True
-                st.rerun()
+            st.session_state.ai_pending = Color.BLACK
+            st.session_state.ai_opening_done = True
         
         # Click-to-move interaction using Streamlit session state
         if 'selected_square' not in st.session_state:
@@ -619,87 +1405,97 @@ def main():
         game.selected_square = st.session_state.selected_square
         game.possible_moves = st.session_state.possible_moves
 
-        # Render interactive board of 8x8 buttons with labels
-        files = "abcdefgh"
-        ranks = "87654321"
-        top_labels = st.columns(9)
-        top_labels[0].markdown("&nbsp;")
-        for c in range(8):
-            top_labels[c+1].markdown(f"**{files[c]}**")
-        last_click_key = "last_board_click"
-        if last_click_key not in st.session_state:
-            st.session_state[last_click_key] = None
-        clicked_cell = None
-        for row in range(8):
-            row_cols = st.columns(9)
-            row_cols[0].markdown(f"**{ranks[row]}**")
-            for col in range(8):
-                piece = game.get_piece(row, col)
-                in_moves = (row, col) in st.session_state.possible_moves
-                # Label rules:
-                # - Piece: show its symbol
-                # - Empty and in_moves: show a dot to indicate legal destination
-                # - Empty otherwise: nbsp to keep layout stable
-                if piece:
-                    label = piece.get_symbol()
-                else:
-                    # Theme-colored squares when empty
-                    if in_moves:
-                        label = "🟢"
-                    else:
-                        if st.session_state.board_style == 'Classic':
-                            label = "🟫" if ((row + col) % 2) else "⬜"
-                        elif st.session_state.board_style == 'Green':
-                            label = "🟩" if ((row + col) % 2) else "🟦"
-                        elif st.session_state.board_style == 'Blue':
-                            label = "🟦" if ((row + col) % 2) else "⬜"
-                        else:  # Dark
-                            label = "⬛" if ((row + col) % 2) else "⬜"
-                is_light = (row + col) % 2 == 0
-                key = f"sq_{row}_{col}"
-                if row_cols[col+1].button(label, key=key, help=position_to_square(row, col), use_container_width=True):
-                    clicked_cell = (row, col)
-
-        # Process click once after rendering grid
-        if clicked_cell is not None:
-            row, col = clicked_cell
-            piece = game.get_piece(row, col)
-            if game.current_player == Color.WHITE:
-                if st.session_state.selected_square is None:
-                    if piece and piece.color == Color.WHITE:
-                        st.session_state.selected_square = (row, col)
-                        st.session_state.possible_moves = game.get_possible_moves(row, col)
-                        st.rerun()
-                else:
-                    from_row, from_col = st.session_state.selected_square
-                    if (row, col) in st.session_state.possible_moves:
-                        if game.make_move(from_row, from_col, row, col):
-                            st.session_state.selected_square = None
-                            st.session_state.possible_moves = []
-                            if not game.is_checkmate() and not game.is_stalemate():
-                                # AI move must trigger a rerun after execution to update board
-                                if game.ai_move():
-                                    st.rerun()
-                            st.rerun()
+        if st.session_state.board_render == 'HTML':
+            st.markdown(st.session_state.board_renderer.render(game, st.session_state.board_style),
+                        unsafe_allow_html=True)
+            play_typed_move(game)
+        else:
+            # Render interactive board of 8x8 buttons with labels
+            files = "abcdefgh"
+            ranks = "87654321"
+            top_labels = st.columns(9)
+            top_labels[0].markdown("&nbsp;")
+            for c in range(8):
+                top_labels[c+1].markdown(f"**{files[c]}**")
+            last_click_key = "last_board_click"
+            if last_click_key not in st.session_state:
+                st.session_state[last_click_key] = None
+            clicked_cell = None
+            for row in range(8):
+                row_cols = st.columns(9)
+                row_cols[0].markdown(f"**{ranks[row]}**")
+                for col in range(8):
+                    piece = game.get_piece(row, col)
+                    in_moves = (row, col) in st.session_state.possible_moves
+                    # Label rules:
+                    # - Piece: show its symbol
+                    # - Empty and in_moves: show a dot to indicate legal destination
+                    # - Empty otherwise: nbsp to keep layout stable
+                    if piece:
+                        label = piece.symbol
                     else:
+                        # Theme-colored squares when empty
+                        if in_moves:
+                            label = "🟢"
+                        else:
+                            if st.session_state.board_style == 'Classic':
+                                label = "🟫" if ((row + col) % 2) else "⬜"
+                            elif st.session_state.board_style == 'Green':
+                                label = "🟩" if ((row + col) % 2) else "🟦"
+                            elif st.session_state.board_style == 'Blue':
+                                label = "🟦" if ((row + col) % 2) else "⬜"
+                            else:  # Dark
+                                label = "⬛" if ((row + col) % 2) else "⬜"
+                    is_light = (row + col) % 2 == 0
+                    key = f"sq_{row}_{col}"
+                    if row_cols[col+1].button(label, key=key, help=position_to_square(row, col), use_container_width=True):
+                        clicked_cell = (row, col)
+
+            # Process click once after rendering grid
+            if clicked_cell is not None:
+                row, col = clicked_cell
+                piece = game.get_piece(row, col)
+                if game.current_player == Color.WHITE:
+                    if st.session_state.selected_square is None:
                         if piece and piece.color == Color.WHITE:
                             st.session_state.selected_square = (row, col)
                             st.session_state.possible_moves = game.get_possible_moves(row, col)
+                            st.rerun()
+                    else:
+                        from_row, from_col = st.session_state.selected_square
+                        if (row, col) in st.session_state.possible_moves:
+                            if game.make_move(from_row, from_col, row, col):
+                                st.session_state.selected_square = None
+                                st.session_state.possible_moves = []
+                                if not (game.is_checkmate() or game.is_stalemate()
+                                        or game.is_threefold_repetition()):
+                                    # The reply is searched in the background and played on a later rerun
+                                    st.session_state.ai_pending = Color.BLACK
+                                st.rerun()
                         else:
-                            st.session_state.selected_square = None
-                            st.session_state.possible_moves = []
-                        st.rerun()
-            else:
-                st.info("Wait for Black (AI) to play; it's not White's turn.")
+                            if piece and piece.color == Color.WHITE:
+                                st.session_state.selected_square = (row, col)
+                                st.session_state.possible_moves = game.get_possible_moves(row, col)
+                            else:
+                                st.session_state.selected_square = None
+                                st.session_state.possible_moves = []
+                            st.rerun()
+                else:
+                    st.info("Wait for Black (AI) to play; it's not White's turn.")
+
+        play_pending_ai_move(game, st.session_state.ai_worker)
 
         # Selection status + legend
         sel = st.session_state.selected_square
-        if sel is None:
-            st.caption("Select a White piece to see its legal moves.")
+        if st.session_state.board_render == 'HTML':
+            st.caption("Type White's move in coordinates (e2e4, or e7e8n to underpromote). Black moves automatically.")
         else:
-            sq = position_to_square(sel[0], sel[1])
-            st.caption(f"Selected: {sq} • Legal moves: {len(st.session_state.possible_moves)}")
-        st.caption("Click a White piece, then click a dotted square to move. Black moves automatically.")
+            if sel is None:
+                st.caption("Select a White piece to see its legal moves.")
+            else:
+                sq = position_to_square(sel[0], sel[1])
+                st.caption(f"Selected: {sq} • Legal moves: {len(st.session_state.possible_moves)}")
+            st.caption("Click a White piece, then click a dotted square to move. Black moves automatically.")
         st.markdown("---")
         st.markdown("**Legend**")
         st.markdown("White: ♔ ♕ ♖ ♗ ♘ ♙")
@@ -782,7 +1578,7 @@ def create_chess_board_html(game: ChessGame) -> str:
             square_class = "light-square" if is_light else "dark-square"
             
             piece = game.get_piece(row, col)
-            piece_symbol = piece.get_symbol() if piece else ""
+            piece_symbol = piece.symbol if piece else ""
             
             square_name = position_to_square(row, col)
             
@@ -0,0 +1,116 @@
+"""Perft correctness suite and benchmark for the chess board backends.
+
+Counts the leaf nodes of the legal move tree for the standard perft test positions
+(https://www.chessprogramming.org/Perft_Results) and checks them against the published
+reference counts, timing each backend. Also checks that make_move rejects illegal moves
+without disturbing the position.
+
+Usage:
+    python chess_perft.py --depth 3
+    python chess_perft.py --depth 4 --position kiwipete --backend bitboard
+"""
+import argparse
+import sys
+import time
+
+from chess_game import BACKENDS, STARTING_FEN, ChessGame
+
+# name -> (FEN, reference node counts for depth 1, 2, ...)
+PERFT_POSITIONS = {
+    "start": (STARTING_FEN, [20, 400, 8902, 197281, 4865609]),
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                 [48, 2039, 97862, 4085603]),
+    "position3": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624]),
+    "position4": ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+                  [6, 264, 9467, 422333]),
+    "position5": ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379, 2103487]),
+    "position6": ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+                  [46, 2079, 89890, 3894594]),
+}
+
+# name -> (FEN, illegal (from_row, from_col, to_row, to_col) move make_move has to refuse)
+REJECTED_MOVES = {
+    "castle through own pieces": (STARTING_FEN, (7, 4, 7, 6)),
+    "long castle through own pieces": (STARTING_FEN, (7, 4, 7, 2)),
+    "castle without rights": ("r3k2r/8/8/8/8/8/8/R3K2R w - - 0 1", (7, 4, 7, 6)),
+    "castle out of check": ("4k3/8/8/8/8/8/4r3/R3K2R w KQ - 0 1", (7, 4, 7, 2)),
+    "king onto own piece": ("4k3/8/8/8/8/8/8/4KB2 w - - 0 1", (7, 4, 7, 5)),
+}
+
+
+def check_rejected_moves(backend: str) -> int:
+    """Number of REJECTED_MOVES that make_move accepted or that changed the position"""
+    failures = 0
+    for name, (fen, move) in REJECTED_MOVES.items():
+        game = ChessGame(backend=backend)
+        game.load_fen(fen)
+        accepted = game.make_move(*move)
+        if accepted or game.to_fen() != fen:
+            print(f"  {backend:>8}: {name}: FAIL ({'accepted' if accepted else 'position changed to ' + game.to_fen()})")
+            failures += 1
+    return failures
+
+
+def run_perft(backend: str, fen: str, depth: int):
+    game = ChessGame(backend=backend)
+    game.load_fen(fen)
+    start = time.perf_counter()
+    nodes = game.perft(depth)
+    elapsed = time.perf_counter() - start
+    return nodes, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time perft node counts on standard test positions")
+    parser.add_argument("--depth", type=int, default=3, help="search depth in plies")
+    parser.add_argument("--backend", choices=BACKENDS, action="append",
+                        help="backend to run (repeatable); defaults to all")
+    parser.add_argument("--position", choices=list(PERFT_POSITIONS), action="append",
+                        help="test position to run (repeatable); defaults to all")
+    parser.add_argument("--divide", action="store_true", help="print the node count below each root move")
+    args = parser.parse_args()
+
+    failures = 0
+    totals = {}
+    for name in args.position or PERFT_POSITIONS:
+        fen, expected_counts = PERFT_POSITIONS[name]
+        expected = expected_counts[args.depth - 1] if 0 < args.depth <= len(expected_counts) else None
+        print(f"{name}: {fen}")
+        for backend in args.backend or BACKENDS:
+            nodes, elapsed = run_perft(backend, fen, args.depth)
+            total_nodes, total_time = totals.get(backend, (0, 0.0))
+            totals[backend] = (total_nodes + nodes, total_time + elapsed)
+            if expected is None:
+                status = "no reference"
+            elif nodes == expected:
+                status = "OK"
+            else:
+                status = f"FAIL (expected {expected:,})"
+                failures += 1
+            print(f"  {backend:>8}: perft({args.depth}) = {nodes:>10,} nodes in {elapsed:7.3f}s "
+                  f"({nodes / max(elapsed, 1e-9):,.0f} nodes/s) {status}")
+            if args.divide:
+                game = ChessGame(backend=backend)
+                game.load_fen(fen)
+                for move, count in sorted(game.perft_divide(args.depth).items()):
+                    print(f"    {move}: {count}")
+
+    for backend in args.backend or BACKENDS:
+        rejected_failures = check_rejected_moves(backend)
+        print(f"{backend:>8}: {len(REJECTED_MOVES) - rejected_failures}/{len(REJECTED_MOVES)} illegal moves "
+              f"rejected cleanly")
+        failures += rejected_failures
+
+    for backend, (nodes, elapsed) in totals.items():
+        print(f"{backend:>8} total: {nodes:,} nodes in {elapsed:.3f}s ({nodes / max(elapsed, 1e-9):,.0f} nodes/s)")
+    if "array" in totals and "bitboard" in totals:
+        speedup = totals["array"][1] / max(totals["bitboard"][1], 1e-9)
+        print(f"bitboard speedup: {speedup:.1f}x")
+
+    if failures:
+        print(f"{failures} failure(s)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
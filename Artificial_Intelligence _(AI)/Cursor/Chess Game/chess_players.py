@@ -0,0 +1,118 @@
+"""Pluggable move-choosing strategies for the chess AI.
+
+A ``Player`` picks a move for the side to move in a ``ChessGame``; ``ChessGame.ai_move_for``
+and ``autoplay`` accept one in place of their built-in strategies, and the tournament runner
+pits them against each other. Players are described by short specs so they can be named on
+the command line and rebuilt in worker processes:
+
+    First                   the first legal move (the old autoplay behaviour)
+    Random                  any legal move
+    Easy / Medium / Hard    the STRENGTH_LEVELS search, with opening book and endgame tables
+    Hard,book=off           a level with some settings overridden
+    depth=4,time=0.5        a custom search (time in seconds; book and ordering default on)
+"""
+import random
+from typing import Dict, Optional, Tuple
+
+from chess_engine import STRENGTH_LEVELS, Move, SearchEngine, SearchResult, TranspositionTable
+
+Choice = Tuple[Optional[Move], Optional[SearchResult]]
+
+
+class Player:
+    """A strategy that picks moves; ``choose`` returns the move and its search result, if any"""
+
+    name = "Player"
+
+    def choose(self, game) -> Choice:
+        raise NotImplementedError
+
+    def new_game(self):
+        """Forget anything learned about the previous game"""
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class FirstMovePlayer(Player):
+    name = "First"
+
+    def choose(self, game) -> Choice:
+        moves = game.get_all_legal_moves()
+        return (moves[0] if moves else None), None
+
+
+class RandomPlayer(Player):
+    name = "Random"
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng or random
+
+    def choose(self, game) -> Choice:
+        moves = game.get_all_legal_moves()
+        return (self.rng.choice(moves) if moves else None), None
+
+
+class EnginePlayer(Player):
+    """Alpha-beta search with its own transposition table, optionally consulting the book and tables first"""
+
+    def __init__(self, name: str, max_depth: int, time_limit: float, book: bool = True,
+                 move_ordering: bool = True):
+        self.name = name
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.book = book
+        self.move_ordering = move_ordering
+        self.tt = TranspositionTable()
+
+    def choose(self, game) -> Choice:
+        if self.book:
+            move, result = game.known_move()
+            if move is not None:
+                return move, result
+        engine = SearchEngine(max_depth=self.max_depth, time_limit=self.time_limit, tt=self.tt,
+                              move_ordering=self.move_ordering)
+        result = engine.search(game)
+        return result.move, result
+
+    def new_game(self):
+        self.tt.clear()
+
+
+def parse_switch(value: str) -> bool:
+    if value.lower() in ("on", "yes", "true", "1"):
+        return True
+    if value.lower() in ("off", "no", "false", "0"):
+        return False
+    raise ValueError(f"Expected on/off, got {value!r}")
+
+
+def make_player(spec: str) -> Player:
+    """Build a player from a spec such as "Medium", "Hard,book=off" or "depth=4,time=0.5" """
+    if spec == FirstMovePlayer.name:
+        return FirstMovePlayer()
+    if spec == RandomPlayer.name:
+        return RandomPlayer()
+
+    parts = [part.strip() for part in spec.split(",") if part.strip()]
+    settings: Dict[str, object] = {"max_depth": 3, "time_limit": 1.0}
+    if parts and "=" not in parts[0]:
+        level = parts.pop(0)
+        if STRENGTH_LEVELS.get(level) is None:
+            raise ValueError(f"Unknown player {level!r}; expected First, Random, "
+                             f"{', '.join(name for name, s in STRENGTH_LEVELS.items() if s)} or depth=...")
+        settings.update(STRENGTH_LEVELS[level])
+    for part in parts:
+        option, _, value = part.partition("=")
+        option = option.strip().lower()
+        if option == "depth":
+            settings["max_depth"] = int(value)
+        elif option == "time":
+            settings["time_limit"] = float(value)
+        elif option == "book":
+            settings["book"] = parse_switch(value)
+        elif option == "ordering":
+            settings["move_ordering"] = parse_switch(value)
+        else:
+            raise ValueError(f"Unknown player option {option!r} in {spec!r}")
+    return EnginePlayer(spec, **settings)
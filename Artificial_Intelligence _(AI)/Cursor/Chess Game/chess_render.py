@@ -0,0 +1,80 @@
+"""Cached HTML board rendering for the Streamlit chess game.
+
+The widget board in ``chess_game.main`` sends 64 buttons to the browser on every rerun.
+``BoardRenderer`` instead draws the board as a single HTML fragment: finished boards are
+cached by (position key, board style, highlights), and a new board only re-renders the
+squares whose piece, style or highlight changed since the previous one, reusing the
+other squares' markup.
+"""
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+# (light, dark) square colors for each sidebar board style
+BOARD_THEMES = {
+    "Classic": ("#f0d9b5", "#b58863"),
+    "Green": ("#eeeed2", "#769656"),
+    "Blue": ("#dee3e6", "#8ca2ad"),
+    "Dark": ("#9e9e9e", "#424242"),
+}
+
+# Square highlights, drawn over the square color
+NO_MARK, SELECTED, TARGET, IN_CHECK = 0, 1, 2, 3
+MARK_COLORS = {SELECTED: "#f6f669", TARGET: "#90ee90", IN_CHECK: "#ff6b6b"}
+
+BOARD_CSS = """<style>
+.chess-board { display: grid; grid-template-columns: repeat(8, 1fr); width: min(480px, 100%);
+  aspect-ratio: 1; border: 2px solid #333; margin: 0 auto; }
+.chess-square { display: flex; align-items: center; justify-content: center;
+  font-size: clamp(20px, 4.5vw, 40px); line-height: 1; user-select: none; }
+</style>"""
+
+
+def square_html(row: int, col: int, symbol: str, style: str, mark: int) -> str:
+    light, dark = BOARD_THEMES.get(style, BOARD_THEMES["Classic"])
+    color = MARK_COLORS.get(mark, light if (row + col) % 2 == 0 else dark)
+    name = "abcdefgh"[col] + "87654321"[row]
+    return f'<div class="chess-square" style="background:{color}" title="{name}">{symbol}</div>'
+
+
+class BoardRenderer:
+    """Builds board HTML from per-square fragments, caching whole boards by position"""
+
+    def __init__(self, max_boards: int = 256):
+        self.max_boards = max_boards
+        self.boards: "OrderedDict[tuple, str]" = OrderedDict()
+        # What each square showed on the last rendered board, and its markup
+        self.square_states: List[Optional[Tuple[int, str, int]]] = [None] * 64
+        self.square_fragments: List[str] = [""] * 64
+        self.squares_rendered = 0
+
+    def render(self, game, style: str, selected: Optional[Tuple[int, int]] = None,
+               targets: Iterable[Tuple[int, int]] = ()) -> str:
+        """The board as one HTML fragment, with optional selection and move-target highlights"""
+        targets = tuple(sorted(targets))
+        key = (game.position_key(), style, selected, targets)
+        html = self.boards.get(key)
+        if html is not None:
+            self.boards.move_to_end(key)
+            return html
+
+        marks = dict.fromkeys(targets, TARGET)
+        for color, square in game.king_squares.items():
+            if game.check_status[color.value]:
+                marks[square] = IN_CHECK
+        if selected is not None:
+            marks[selected] = SELECTED
+
+        for sq in range(64):
+            row, col = divmod(sq, 8)
+            piece = game.board[row][col]
+            state = (piece.code if piece else -1, style, marks.get((row, col), NO_MARK))
+            if state != self.square_states[sq]:
+                self.square_states[sq] = state
+                self.square_fragments[sq] = square_html(row, col, piece.symbol if piece else "", style, state[2])
+                self.squares_rendered += 1
+
+        html = f'{BOARD_CSS}<div class="chess-board">{"".join(self.square_fragments)}</div>'
+        self.boards[key] = html
+        if len(self.boards) > self.max_boards:
+            self.boards.popitem(last=False)
+        return html
@@ -0,0 +1,64 @@
+"""Node-count benchmark for the search engine's move ordering.
+
+Searches each standard test position to a fixed depth with move ordering (MVV-LVA captures,
+killer moves, history heuristic, staged generation) switched off and on, and reports how
+many nodes the ordering saves. Each search is capped by a time limit, since unordered
+quiescence search can blow up on tactical positions; capped searches are reported and left
+out of the totals.
+
+Usage:
+    python chess_search_bench.py --depth 4
+"""
+import argparse
+import time
+
+from chess_engine import SearchEngine
+from chess_game import BACKENDS, ChessGame
+from chess_perft import PERFT_POSITIONS
+
+
+def run_search(fen: str, depth: int, move_ordering: bool, backend: str, time_limit: float):
+    game = ChessGame(backend=backend)
+    game.load_fen(fen)
+    engine = SearchEngine(max_depth=depth, time_limit=time_limit, move_ordering=move_ordering)
+    start = time.perf_counter()
+    result = engine.search(game)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare search node counts with and without move ordering")
+    parser.add_argument("--depth", type=int, default=4, help="fixed search depth in plies")
+    parser.add_argument("--backend", choices=BACKENDS, default="bitboard", help="move generator")
+    parser.add_argument("--time-limit", type=float, default=30.0, help="cap on each search in seconds")
+    parser.add_argument("--position", choices=list(PERFT_POSITIONS), action="append",
+                        help="test position to search (repeatable); defaults to all")
+    args = parser.parse_args()
+
+    totals = {False: [0, 0.0], True: [0, 0.0]}
+    for name in args.position or PERFT_POSITIONS:
+        fen = PERFT_POSITIONS[name][0]
+        print(f"{name}: {fen}")
+        runs = {}
+        for ordering in (False, True):
+            result, elapsed = run_search(fen, args.depth, ordering, args.backend, args.time_limit)
+            runs[ordering] = (result, elapsed)
+            label = "ordered" if ordering else "unordered"
+            status = "" if result.depth == args.depth else f" (time limit hit, depth {result.depth} done)"
+            print(f"  {label:>9}: {result.nodes:>9,} nodes in {elapsed:7.2f}s, "
+                  f"score {result.score:>6}, move {result.move}{status}")
+        if all(result.depth == args.depth for result, _ in runs.values()):
+            for ordering, (result, elapsed) in runs.items():
+                totals[ordering][0] += result.nodes
+                totals[ordering][1] += elapsed
+
+    (plain_nodes, plain_time), (ordered_nodes, ordered_time) = totals[False], totals[True]
+    print("positions completed by both searches:")
+    print(f"unordered total: {plain_nodes:,} nodes in {plain_time:.2f}s")
+    print(f"  ordered total: {ordered_nodes:,} nodes in {ordered_time:.2f}s")
+    print(f"node reduction: {1 - ordered_nodes / max(plain_nodes, 1):.1%}, "
+          f"time speedup: {plain_time / max(ordered_time, 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Parallel self-play runner for ChessGame.
+
+Plays N games between two AI players (strength levels or other player specs, see
+``chess_players``) across a process pool and streams one JSON line per finished game
+(result, termination, plies, per-side move stats, PGN) to a file, then reports games/sec.
+
+Usage:
+    python chess_selfplay.py --games 100 --white Easy --black Random --output selfplay.jsonl
+"""
+import argparse
+import json
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from chess_game import BACKENDS, STARTING_FEN, ChessGame, Color
+from chess_players import make_player
+
+
+def play_game(index: int, white: str, black: str, backend: str = "bitboard", max_plies: int = 200,
+              fen: str = STARTING_FEN, seed: int = 0) -> dict:
+    """Play one game between two player specs and describe how it ended"""
+    random.seed(seed + index)
+    game = ChessGame(backend=backend)
+    if fen != STARTING_FEN:
+        game.load_fen(fen)
+    players = {Color.WHITE: make_player(white), Color.BLACK: make_player(black)}
+    stats = {color: {"moves": 0, "seconds": 0.0, "nodes": 0} for color in players}
+    start = time.perf_counter()
+
+    termination, result = "max plies", "*"
+    while True:
+        if game.is_checkmate():
+            termination, result = "checkmate", game.game_result()
+            break
+        if game.is_stalemate():
+            termination, result = "stalemate", "1/2-1/2"
+            break
+        if game.is_threefold_repetition():
+            termination, result = "threefold repetition", "1/2-1/2"
+            break
+        if game.halfmove_clock >= 100:
+            termination, result = "fifty-move rule", "1/2-1/2"
+            break
+        if len(game.san_history) >= max_plies:
+            break
+        color = game.current_player
+        move_start = time.perf_counter()
+        if not game.ai_move_for(color, player=players[color]):
+            termination = "no move"
+            break
+        stats[color]["moves"] += 1
+        stats[color]["seconds"] += time.perf_counter() - move_start
+        if game.last_search is not None:
+            stats[color]["nodes"] += game.last_search.nodes
+
+    return {
+        "game": index,
+        "white": white,
+        "black": black,
+        "result": result,
+        "termination": termination,
+        "plies": len(game.san_history),
+        "seconds": round(time.perf_counter() - start, 3),
+        "white_stats": stats[Color.WHITE],
+        "black_stats": stats[Color.BLACK],
+        "final_fen": game.to_fen(),
+        "pgn": game.to_pgn(white=f"{white} AI", black=f"{black} AI", event="Self-play",
+                           result=result),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play AI-vs-AI games in parallel and stream them to JSONL")
+    parser.add_argument("--games", type=int, default=20, help="number of games to play")
+    parser.add_argument("--white", default="Easy", help="White's player: a strength level or player spec")
+    parser.add_argument("--black", default="Easy", help="Black's player: a strength level or player spec")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--backend", choices=BACKENDS, default="bitboard", help="move generator")
+    parser.add_argument("--max-plies", type=int, default=200, help="stop unfinished games after this many plies")
+    parser.add_argument("--fen", default=STARTING_FEN, help="start every game from this position")
+    parser.add_argument("--seed", type=int, default=0, help="base seed; game i uses seed + i")
+    parser.add_argument("--output", default="selfplay.jsonl", help="JSONL file to write games to")
+    args = parser.parse_args()
+    for spec in (args.white, args.black):
+        try:
+            make_player(spec)
+        except ValueError as error:
+            parser.error(str(error))
+
+    results = Counter()
+    plies = 0
+    start = time.perf_counter()
+    with open(args.output, "w", encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(play_game, i, args.white, args.black, args.backend,
+                               args.max_plies, args.fen, args.seed)
+                   for i in range(args.games)]
+        for done, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            results[record["result"]] += 1
+            plies += record["plies"]
+            print(f"[{done}/{args.games}] game {record['game']}: {record['result']} "
+                  f"({record['termination']}, {record['plies']} plies)")
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.white} (White) vs {args.black} (Black): {results['1-0']} wins, "
+          f"{results['1/2-1/2']} draws, {results['0-1']} losses, {results['*']} unfinished")
+    print(f"{args.games} games, {plies:,} plies in {elapsed:.2f}s with {args.workers} workers "
+          f"({args.games / max(elapsed, 1e-9):.2f} games/s)")
+    print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Round-robin tournament between chess AI players.
+
+Every pair of players (strength levels or player specs, see ``chess_players``) plays a
+number of games with alternating colors across a process pool. Each finished game is
+streamed to a JSONL file as in ``chess_selfplay``; at the end the runner prints a table of
+scores, win rates and Elo estimates alongside each player's average time per move and
+search speed, so speed-versus-strength trade-offs can be judged from data. Unfinished
+games (ply cap reached or no move produced, result "*") are counted in their own column
+and left out of the scores and the Elo fit.
+
+Usage:
+    python chess_tournament.py Random Easy Medium "Medium,book=off" --games 10
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+
+from chess_game import BACKENDS, STARTING_FEN
+from chess_players import make_player
+from chess_selfplay import play_game
+
+# Points of finished games; unfinished ones ("*") carry no result
+RESULT_POINTS = {"1-0": (1.0, 0.0), "0-1": (0.0, 1.0), "1/2-1/2": (0.5, 0.5)}
+
+
+def elo_ratings(games: List[dict], players: List[str], base: float = 1500.0,
+                iterations: int = 500) -> Dict[str, float]:
+    """Maximum-likelihood Elo ratings (Bradley-Terry) with the players averaging `base`
+
+    Draws count as half a win each, unfinished games are ignored, and every pair is credited
+    one extra virtual draw so that a player who never scored still gets a finite rating.
+    """
+    points: Dict[str, float] = defaultdict(float)
+    meetings: Dict[Tuple[str, str], int] = defaultdict(int)
+    for a, b in itertools.combinations(players, 2):
+        points[a] += 0.5
+        points[b] += 0.5
+        meetings[a, b] = meetings[b, a] = 1
+    for game in games:
+        if game["result"] not in RESULT_POINTS:
+            continue
+        white_points, black_points = RESULT_POINTS[game["result"]]
+        points[game["white"]] += white_points
+        points[game["black"]] += black_points
+        meetings[game["white"], game["black"]] += 1
+        meetings[game["black"], game["white"]] += 1
+
+    # Minorization-maximization updates of each player's strength gamma = 10^(elo / 400)
+    gamma = dict.fromkeys(players, 1.0)
+    for _ in range(iterations):
+        for player in players:
+            denominator = sum(meetings[player, other] / (gamma[player] + gamma[other])
+                              for other in players if other != player)
+            if denominator:
+                gamma[player] = points[player] / denominator
+        mean_log = sum(math.log10(g) for g in gamma.values()) / len(players)
+        gamma = {player: g / 10 ** mean_log for player, g in gamma.items()}
+    return {player: base + 400 * math.log10(g) for player, g in gamma.items()}
+
+
+def summarize(games: List[dict], players: List[str]) -> Dict[str, dict]:
+    """Per-player W/D/L, unfinished games, score, move count, thinking time and nodes over all games"""
+    summary = {player: {"games": 0, "wins": 0, "draws": 0, "losses": 0, "unfinished": 0, "points": 0.0,
+                        "moves": 0, "seconds": 0.0, "nodes": 0} for player in players}
+    for game in games:
+        for index, side in enumerate(("white", "black")):
+            row = summary[game[side]]
+            row["games"] += 1
+            for field in ("moves", "seconds", "nodes"):
+                row[field] += game[f"{side}_stats"][field]
+            if game["result"] not in RESULT_POINTS:
+                row["unfinished"] += 1
+                continue
+            own = RESULT_POINTS[game["result"]][index]
+            row["points"] += own
+            if own == 1.0:
+                row["wins"] += 1
+            elif own == 0.0:
+                row["losses"] += 1
+            else:
+                row["draws"] += 1
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a round-robin tournament between AI players")
+    parser.add_argument("players", nargs="+", help="strength levels or player specs, e.g. Medium 'depth=4,time=0.5'")
+    parser.add_argument("--games", type=int, default=10, help="games per pairing (colors alternate)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--backend", choices=BACKENDS, default="bitboard", help="move generator")
+    parser.add_argument("--max-plies", type=int, default=200, help="stop unfinished games after this many plies")
+    parser.add_argument("--fen", default=STARTING_FEN, help="start every game from this position")
+    parser.add_argument("--seed", type=int, default=0, help="base seed; game i uses seed + i")
+    parser.add_argument("--output", default="tournament.jsonl", help="JSONL file to write games to")
+    args = parser.parse_args()
+    if len(set(args.players)) < 2:
+        parser.error("need at least two different players")
+    players = list(dict.fromkeys(args.players))
+    for spec in players:
+        try:
+            make_player(spec)
+        except ValueError as error:
+            parser.error(str(error))
+
+    pairings = []
+    for a, b in itertools.combinations(players, 2):
+        pairings += [(a, b) if i % 2 == 0 else (b, a) for i in range(args.games)]
+
+    games = []
+    start = time.perf_counter()
+    with open(args.output, "w", encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(play_game, i, white, black, args.backend, args.max_plies, args.fen, args.seed)
+                   for i, (white, black) in enumerate(pairings)]
+        for done, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            games.append(record)
+            print(f"[{done}/{len(pairings)}] {record['white']} vs {record['black']}: "
+                  f"{record['result']} ({record['termination']}, {record['plies']} plies)")
+    elapsed = time.perf_counter() - start
+
+    ratings = elo_ratings(games, players)
+    summary = summarize(games, players)
+    width = max(len(player) for player in players)
+    print(f"\n{'player':<{width}}  games   W   D   L   U  score   win%     Elo  ms/move    nodes/s")
+    for player in sorted(players, key=ratings.get, reverse=True):
+        row = summary[player]
+        finished = max(row["games"] - row["unfinished"], 1)
+        ms_per_move = 1000 * row["seconds"] / max(row["moves"], 1)
+        nps = row["nodes"] / row["seconds"] if row["seconds"] > 0 else 0.0
+        print(f"{player:<{width}}  {row['games']:>5} {row['wins']:>3} {row['draws']:>3} {row['losses']:>3} "
+              f"{row['unfinished']:>3} {row['points'] / finished:>6.1%} {row['wins'] / finished:>6.1%} "
+              f"{ratings[player]:>7.0f} {ms_per_move:>8.1f} {nps:>10,.0f}")
+    print(f"\n{len(pairings)} games in {elapsed:.2f}s with {args.workers} workers; wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""Pathfinding autopilot for snake_game.
+
+``Autopilot.next_direction`` steers a ``SnakeState`` along a cached plan:
+
+* To the food by A* (Manhattan heuristic), but only if a simulated snake that has followed
+  the path and grown can still reach its own tail afterwards. Searches know when each body
+  cell will be left behind by the tail, so paths may cross the body where it will be gone.
+* Otherwise along a path to its own tail, stretched with detours so the body keeps moving
+  over new ground instead of circling the same loop. Once the head has a path to the tail
+  through free cells, following the body never collides while no food is eaten, and the
+  plan extends itself by one cell per tick (the cell that becomes the new tail), so it
+  costs O(1) per tick. After a body length of chasing it retries the food.
+
+This is a heuristic, not a guarantee of survival. The reachability checks find shortest
+timed paths and miss those that must wait for the body to move out of the way, so on small
+or crowded boards the snake can still box itself in: without a path to its tail it falls
+back to the free neighbour with the most room. In 30 seeded games on each board from 6x6 to
+12x12 (6000-tick cap), 5 of 210 died, all with the snake covering half the board or more.
+
+Plans are only recomputed when they go stale: when the food moves, or when the next planned
+cell is not free. Between those events only the head enters a cell (the planned one) and the
+tail leaves one, so a plan stays valid without re-searching. Cells are flat indices
+``row * cols + col``.
+
+Run ``python snake_autopilot.py --sizes 20 50 200`` to measure planning time per tick.
+"""
+import argparse
+import heapq
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from snake_rules import DOWN, LEFT, RIGHT, UP, SnakeState, change_direction, init_game, move_snake
+
+
+def free_times(body: List[int], cells: int) -> List[int]:
+    """For every cell, the number of moves until it is free: a body segment (listed head first)
+    is left behind once the tail has passed it, free cells are free now"""
+    free_at = [0] * cells
+    length = len(body)
+    for i, cell in enumerate(body):
+        free_at[cell] = length - i
+    return free_at
+
+
+def a_star(start: int, goal: int, free_at: List[int], rows: int, cols: int) -> Optional[List[int]]:
+    """Shortest path from start to goal (start excluded) that only enters a cell once it is free,
+    as given by free_times"""
+    goal_r, goal_c = divmod(goal, cols)
+    best = {start: 0}
+    came_from = {start: -1}
+    start_r, start_c = divmod(start, cols)
+    # Ties on f go to the deeper node, which heads straight for the goal on open grids
+    heap = [(abs(start_r - goal_r) + abs(start_c - goal_c), 0, start)]
+    while heap:
+        _, neg_cost, cell = heapq.heappop(heap)
+        if cell == goal:
+            path = []
+            while cell != start:
+                path.append(cell)
+                cell = came_from[cell]
+            return path[::-1]
+        cost = -neg_cost
+        if cost > best[cell]:
+            continue
+        r, c = divmod(cell, cols)
+        for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+            if not (0 <= nr < rows and 0 <= nc < cols):
+                continue
+            neighbour = nr * cols + nc
+            if free_at[neighbour] > cost + 1:
+                continue
+            if cost + 1 < best.get(neighbour, cost + 2):
+                best[neighbour] = cost + 1
+                came_from[neighbour] = cell
+                heapq.heappush(heap, (cost + 1 + abs(nr - goal_r) + abs(nc - goal_c), -(cost + 1), neighbour))
+    return None
+
+
+def lengthen(path: List[int], blocked: bytearray, cols: int, limit: int) -> List[int]:
+    """Stretch a path (start included) with detours through unblocked cells, up to `limit` cells:
+    each step a -> b becomes a -> a' -> b' -> b where a' and b' are side by side next to it"""
+    for cell in path:
+        blocked[cell] = 1
+    rows = len(blocked) // cols
+    i = 0
+    while i < len(path) - 1 and len(path) < limit:
+        a, b = path[i], path[i + 1]
+        a_r, a_c = divmod(a, cols)
+        b_r, b_c = divmod(b, cols)
+        # Sideways offsets perpendicular to the step
+        offsets = ((-1, 0), (1, 0)) if a_r == b_r else ((0, -1), (0, 1))
+        for dr, dc in offsets:
+            if not (0 <= a_r + dr < rows and 0 <= a_c + dc < cols and 0 <= b_r + dr < rows and 0 <= b_c + dc < cols):
+                continue
+            side_a, side_b = a + dr * cols + dc, b + dr * cols + dc
+            if not blocked[side_a] and not blocked[side_b]:
+                path[i + 1:i + 1] = [side_a, side_b]
+                blocked[side_a] = blocked[side_b] = 1
+                break
+        else:
+            i += 1
+    return path
+
+
+class Autopilot:
+    """Chooses each move for a snake from a plan that is kept until it goes stale"""
+
+    def __init__(self):
+        self.plan: Deque[int] = deque()  # cells still to visit, next first
+        self.mode: Optional[str] = None  # "food" or "tail"
+        self.food: Optional[Tuple[int, int]] = None  # the food the plan was made for
+        self.retry = 0  # ticks of tail chasing left before looking for a safe path to food again
+        self.extend = False  # whether the tail-chasing plan may grow along the body
+        self.replans = 0
+
+    def next_direction(self, state: SnakeState) -> Tuple[int, int]:
+        cols = state.cols
+        if not self.plan_valid(state):
+            self.replan(state)
+        head_r, head_c = state.snake[0]
+        if not self.plan:
+            return self.escape(state)
+
+        target = self.plan.popleft()
+        if self.mode == "tail":
+            self.retry -= 1
+            if self.extend and divmod(target, cols) != state.food:
+                # The tail moves on to the next body cell, so chase that one next
+                tail_r, tail_c = state.snake[-2]
+                self.plan.append(tail_r * cols + tail_c)
+        target_r, target_c = divmod(target, cols)
+        return target_r - head_r, target_c - head_c
+
+    def plan_valid(self, state: SnakeState) -> bool:
+        """Whether the cached plan still fits: same food, and the next cell is a free neighbour"""
+        if not self.plan or self.food != state.food or (self.mode == "tail" and self.retry <= 0):
+            return False
+        head_r, head_c = state.snake[0]
+        target_r, target_c = divmod(self.plan[0], state.cols)
+        if abs(target_r - head_r) + abs(target_c - head_c) != 1:
+            return False
+        target = (target_r, target_c)
+        return target not in state.occupied or (target == state.snake[-1] and target != state.food)
+
+    def replan(self, state: SnakeState):
+        self.replans += 1
+        self.food = state.food
+        rows, cols = state.rows, state.cols
+        body = [r * cols + c for r, c in state.snake]
+        free_at = free_times(body, rows * cols)
+
+        if state.food[0] >= 0:
+            path = a_star(body[0], state.food[0] * cols + state.food[1], free_at, rows, cols)
+            if path is not None and self.safe_after(body, path, rows, cols):
+                self.plan, self.mode = deque(path), "food"
+                return
+
+        # Chase the tail through cells that are free now, so that the plan can keep following the
+        # body in order. A path through cells that only free up later is replanned every tick,
+        # since the tail it aims for keeps moving away
+        for cell in body[:-1]:
+            free_at[cell] = rows * cols
+        path = a_star(body[0], body[-1], free_at, rows, cols)
+        self.extend = path is not None
+        self.retry = len(body) if self.extend else 1
+        if path is not None:
+            blocked = bytearray(rows * cols)
+            for cell in body:
+                blocked[cell] = 1
+            path = lengthen([body[0]] + path, blocked, cols, len(path) + 2 * len(body))[1:]
+        else:
+            path = a_star(body[0], body[-1], free_times(body, rows * cols), rows, cols)
+        if path is not None:
+            self.plan, self.mode = deque(path), "tail"
+        else:
+            self.plan.clear()
+
+    @staticmethod
+    def safe_after(body: List[int], path: List[int], rows: int, cols: int) -> bool:
+        """Whether the snake, having followed `path` and eaten, can still reach its tail"""
+        length = len(body) + 1
+        if length >= rows * cols:
+            return True
+        after = (path[::-1] + body)[:length]
+        return a_star(after[0], after[-1], free_times(after, rows * cols), rows, cols) is not None
+
+    @staticmethod
+    def escape(state: SnakeState) -> Tuple[int, int]:
+        """Without any plan, step to the free neighbour with the most free neighbours of its own"""
+        def free(cell: Tuple[int, int]) -> bool:
+            r, c = cell
+            return (0 <= r < state.rows and 0 <= c < state.cols
+                    and (cell not in state.occupied or cell == state.snake[-1]))
+
+        head_r, head_c = state.snake[0]
+        options = []
+        for dr, dc in (UP, DOWN, LEFT, RIGHT):
+            cell = (head_r + dr, head_c + dc)
+            if free(cell):
+                room = sum(free((cell[0] + r, cell[1] + c)) for r, c in (UP, DOWN, LEFT, RIGHT))
+                options.append((room, (dr, dc)))
+        return max(options)[1] if options else state.direction
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play snake with the autopilot and time its planning")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50, 200], help="square grid sizes")
+    parser.add_argument("--max-ticks", type=int, default=20000, help="stop each game after this many ticks")
+    args = parser.parse_args()
+
+    print(f"{'grid':>9} {'ticks':>7} {'score':>6} {'filled':>7} {'replans':>8} {'ms/tick':>8} {'max ms':>7}")
+    for size in args.sizes:
+        state = init_game(size, size)
+        pilot = Autopilot()
+        total = worst = 0.0
+        ticks = 0
+        while state.alive and ticks < args.max_ticks and state.food[0] >= 0:
+            start = time.perf_counter()
+            change_direction(state, pilot.next_direction(state))
+            elapsed = time.perf_counter() - start
+            total += elapsed
+            worst = max(worst, elapsed)
+            move_snake(state)
+            ticks += 1
+        print(f"{size:>4}x{size:<4} {ticks:>7} {state.score:>6} {len(state.snake) / size ** 2:>7.1%} "
+              f"{pilot.replans:>8} {1000 * total / max(ticks, 1):>8.3f} {1000 * worst:>7.2f}"
+              f"{'' if state.alive else '  (died)'}")
+
+
+if __name__ == "__main__":
+    main()
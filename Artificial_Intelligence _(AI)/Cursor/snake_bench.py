@@ -0,0 +1,95 @@
+"""Tick and food-placement benchmark for snake_game.
+
+Drives a snake around a Hamiltonian cycle of the grid (so it never dies) for a fixed number
+of ticks at several grid sizes and snake lengths, and times ``move_snake``, ``new_food`` and
+``BoardRenderer.render``. With the deque, occupancy set and free-cell index, and the frame
+buffer that only repaints changed cells, all three should stay flat as the grid and the
+snake grow.
+
+Usage:
+    python snake_bench.py --sizes 20 100 200 --ticks 20000
+"""
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+from snake_render import BoardRenderer
+from snake_rules import DOWN, LEFT, RIGHT, UP, move_snake, new_food, new_state
+
+
+def cycle_direction(r: int, c: int, rows: int, cols: int) -> Tuple[int, int]:
+    """Next step of a cycle through every cell: right along even rows, left along odd rows
+    (skipping column 0), then back up column 0. Needs an even number of rows."""
+    if c == 0:
+        return UP if r > 0 else RIGHT
+    if r % 2 == 0:
+        return RIGHT if c < cols - 1 else DOWN
+    if c > 1:
+        return LEFT
+    return LEFT if r == rows - 1 else DOWN
+
+
+def cycle_path(length: int, rows: int, cols: int) -> List[Tuple[int, int]]:
+    path = [(0, 0)]
+    while len(path) < length:
+        r, c = path[-1]
+        dr, dc = cycle_direction(r, c, rows, cols)
+        path.append((r + dr, c + dc))
+    return path
+
+
+def run(size: int, length: int, ticks: int) -> Tuple[float, float, float, int]:
+    """Microseconds per tick, per food placement and per rendered frame, and the final snake length"""
+    path = cycle_path(length, size, size)
+    head = path[-1]
+    state = new_state(reversed(path), cycle_direction(*path[-2], size, size), size, size)
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        state.direction = cycle_direction(*head, size, size)
+        move_snake(state)
+        head = state.snake[0]
+    tick_us = (time.perf_counter() - start) / ticks * 1e6
+    assert state.alive, "the snake left its cycle"
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        new_food(state)
+    food_us = (time.perf_counter() - start) / ticks * 1e6
+
+    renderer = BoardRenderer()
+    renderer.render(state)
+    frame_s = 0.0
+    for _ in range(ticks):
+        state.direction = cycle_direction(*head, size, size)
+        move_snake(state)
+        head = state.snake[0]
+        start = time.perf_counter()
+        renderer.render(state)
+        frame_s += time.perf_counter() - start
+    assert state.alive, "the snake left its cycle"
+    return tick_us, food_us, frame_s / ticks * 1e6, len(state.snake)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time snake ticks and food placement on growing grids")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50, 100, 200],
+                        help="square grid sizes (even)")
+    parser.add_argument("--ticks", type=int, default=20000, help="ticks to time per run")
+    parser.add_argument("--seed", type=int, default=0, help="food placement seed")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    print(f"{'grid':>9} {'length':>7} {'us/tick':>9} {'us/food':>9} {'us/frame':>9} {'final':>7}")
+    for size in args.sizes:
+        if size % 2:
+            parser.error("grid sizes must be even")
+        cells = size * size
+        for length in sorted({3, cells // 10, cells // 2, cells * 9 // 10}):
+            tick_us, food_us, frame_us, final = run(size, max(length, 3), args.ticks)
+            print(f"{size:>4}x{size:<4} {length:>7} {tick_us:>9.2f} {food_us:>9.2f} {frame_us:>9.2f} {final:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,136 +1,67 @@
 import streamlit as st
-import random
+import streamlit.components.v1 as components
+import os
 import time
-from dataclasses import dataclass
-from typing import List, Tuple, Set
-import numpy as np
-
-# Grid settings
-GRID_ROWS = 20
-GRID_COLS = 20
-CELL_SIZE_PX = 24
-
-# Directions
-UP = (-1, 0)
-DOWN = (1, 0)
-LEFT = (0, -1)
-RIGHT = (0, 1)
-OPPOSITE = {UP: DOWN, DOWN: UP, LEFT: RIGHT, RIGHT: LEFT}
-
-@dataclass
-class SnakeState:
-    snake: List[Tuple[int, int]]
-    direction: Tuple[int, int]
-    food: Tuple[int, int]
-    score: int
-    speed_ms: int
-    alive: bool
-    paused: bool
-
-
-def new_food(occupied: Set[Tuple[int, int]]) -> Tuple[int, int]:
-    free = [
-        (r, c)
-        for r in range(GRID_ROWS)
-        for c in range(GRID_COLS)
-        if (r, c) not in occupied
-    ]
-    return random.choice(free) if free else (-1, -1)
-
-
-def init_game() -> SnakeState:
-    mid_r, mid_c = GRID_ROWS // 2, GRID_COLS // 2
-    snake = [(mid_r, mid_c - 1), (mid_r, mid_c), (mid_r, mid_c + 1)]  # horizontal start
-    direction = LEFT
-    occupied = set(snake)
-    food = new_food(occupied)
-    return SnakeState(
-        snake=snake,
-        direction=direction,
-        food=food,
-        score=0,
-        speed_ms=140,
-        alive=True,
-        paused=False,
-    )
-
-
-def move_snake(state: SnakeState) -> SnakeState:
-    if not state.alive or state.paused:
-        return state
 
-    head_r, head_c = state.snake[0]
-    dr, dc = state.direction
-    new_head = (head_r + dr, head_c + dc)
+from snake_autopilot import Autopilot
+from snake_render import BoardRenderer
+from snake_rules import (DOWN, GRID_COLS, GRID_ROWS, LEFT, RIGHT, UP, SnakeState, change_direction,
+                         init_game, move_snake)
 
-    # Wall collision
-    if not (0 <= new_head[0] < GRID_ROWS and 0 <= new_head[1] < GRID_COLS):
-        state.alive = False
-        return state
+# Browser-side game for the "Client" loop: a static page, so no frontend build step
+snake_client = components.declare_component(
+    "snake_client", path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "snake_component")
+)
 
-    # Self collision (allow tail cell only if not growing)
-    will_grow = new_head == state.food
-    body_cells = set(state.snake[:-1] if not will_grow else state.snake)
-    if new_head in body_cells:
-        state.alive = False
-        return state
 
-    state.snake.insert(0, new_head)
+def draw_board(state: SnakeState, renderer: BoardRenderer):
+    # Classic snake grid using a colored image, sent as ready-made PNG bytes so Streamlit
+    # passes them through instead of encoding the array again
+    st.image(renderer.png(state), caption=f"Score: {state.score}", output_format="PNG",
+             use_container_width=False)
 
-    if will_grow:
-        state.score += 1
-        occupied = set(state.snake)
-        state.food = new_food(occupied)
-    else:
-        state.snake.pop()  # move forward
 
-    return state
+def run_client_loop():
+    """Play in the browser; the script only reruns when the component reports a new game, a score or game over"""
+    if "client_reset" not in st.session_state:
+        st.session_state.client_reset = 0
+    if "client_event_id" not in st.session_state:
+        st.session_state.client_event_id = None
+    if "client_score" not in st.session_state:
+        st.session_state.client_score = 0
+    if "client_alive" not in st.session_state:
+        st.session_state.client_alive = True
 
+    with st.sidebar:
+        st.header("Controls")
+        st.caption("Click the board, then use the arrow keys or W/A/S/D. Space pauses, R restarts.")
+        speed = st.slider("Speed (ms/step)", 60, 300, st.session_state.snake_state.speed_ms, 10)
+        st.session_state.snake_state.speed_ms = speed
+        if st.button("Reset Game"):
+            st.session_state.client_reset += 1
+            st.session_state.client_score = 0
+            st.session_state.client_alive = True
+
+    event = snake_client(
+        rows=GRID_ROWS,
+        cols=GRID_COLS,
+        speed_ms=speed,
+        high_score=st.session_state.high_score,
+        reset_token=st.session_state.client_reset,
+        key="snake_client",
+        default=None,
+    )
+    # The component keeps returning its last event, so only act on new ones
+    if event and event["id"] != st.session_state.client_event_id:
+        st.session_state.client_event_id = event["id"]
+        st.session_state.client_score = event["score"]
+        st.session_state.client_alive = event["event"] != "game_over"
+        st.session_state.high_score = max(st.session_state.high_score, event["high_score"])
 
-def change_direction(state: SnakeState, new_dir: Tuple[int, int]):
-    if OPPOSITE.get(new_dir) == state.direction:
-        return
-    state.direction = new_dir
-
-
-def draw_board(state: SnakeState):
-    # Classic snake grid using a colored image
-    cell = CELL_SIZE_PX
-    height = GRID_ROWS * cell
-    width = GRID_COLS * cell
-    # Background
-    img = np.zeros((height, width, 3), dtype=np.uint8)
-    bg_light = np.array([30, 30, 30], dtype=np.uint8)
-    bg_dark = np.array([38, 38, 38], dtype=np.uint8)
-    # Checkerboard background for subtle grid effect
-    for r in range(GRID_ROWS):
-        for c in range(GRID_COLS):
-            color = bg_light if (r + c) % 2 == 0 else bg_dark
-            img[r*cell:(r+1)*cell, c*cell:(c+1)*cell] = color
-
-    # Food
-    fr, fc = state.food
-    food_color = np.array([220, 60, 60], dtype=np.uint8)  # red
-    img[fr*cell:(fr+1)*cell, fc*cell:(fc+1)*cell] = food_color
-
-    # Snake body
-    body_color = np.array([60, 200, 100], dtype=np.uint8)  # green
-    for (r, c) in state.snake[1:]:
-        img[r*cell:(r+1)*cell, c*cell:(c+1)*cell] = body_color
-
-    # Snake head
-    hr, hc = state.snake[0]
-    head_color = np.array([250, 210, 70], dtype=np.uint8)  # yellow
-    img[hr*cell:(hr+1)*cell, hc*cell:(hc+1)*cell] = head_color
-
-    # Optional grid lines overlay
-    line_color = (50, 50, 50)
-    for r in range(GRID_ROWS + 1):
-        img[min(r*cell, height-1), :, :] = line_color
-    for c in range(GRID_COLS + 1):
-        img[:, min(c*cell, width-1), :] = line_color
-
-    st.image(img, caption=f"Score: {state.score}", use_container_width=False)
+    cols = st.columns(3)
+    cols[0].metric("Score", st.session_state.client_score)
+    cols[1].metric("High Score", st.session_state.high_score)
+    cols[2].metric("Status", "Alive" if st.session_state.client_alive else "Game Over")
 
 
 def main():
@@ -144,6 +75,19 @@ def main():
         st.session_state.high_score = 0
     if "key_input" not in st.session_state:
         st.session_state.key_input = ""
+    if "autopilot" not in st.session_state:
+        st.session_state.autopilot = Autopilot()
+    if "board_renderer" not in st.session_state:
+        st.session_state.board_renderer = BoardRenderer()
+
+    st.sidebar.radio(
+        "Game loop", ["Server", "Client"], key="game_loop",
+        help="Client runs the game in your browser and only sends scores back; "
+             "Server steps it here with a full rerun per frame.",
+    )
+    if st.session_state.game_loop == "Client":
+        run_client_loop()
+        return
 
     state: SnakeState = st.session_state.snake_state
 
@@ -162,11 +106,14 @@ def main():
             if st.button("➡️ Right"):
                 change_direction(state, RIGHT)
         st.markdown("---")
+        st.toggle("Autopilot", key="autopilot_on",
+                  help="Steer toward the food by A*, following the tail when eating isn't safe.")
         state.paused = st.toggle("Pause", value=state.paused)
         speed = st.slider("Speed (ms/step)", 60, 300, state.speed_ms, 10)
         state.speed_ms = speed
         if st.button("Reset Game"):
             st.session_state.snake_state = init_game()
+            st.session_state.autopilot = Autopilot()
             st.rerun()
 
     # Keyboard input (focus this box and press W/A/S/D)
@@ -198,11 +145,13 @@ def main():
     cols[1].metric("High Score", st.session_state.high_score)
     cols[2].metric("Status", "Alive" if state.alive else "Game Over")
 
-    draw_board(state)
+    draw_board(state, st.session_state.board_renderer)
 
     # Auto tick
     if state.alive and not state.paused:
         time.sleep(state.speed_ms / 1000.0)
+        if st.session_state.autopilot_on:
+            change_direction(state, st.session_state.autopilot.next_direction(state))
         st.session_state.snake_state = move_snake(state)
         st.session_state.high_score = max(st.session_state.high_score, state.score)
         st.rerun()
@@ -210,6 +159,7 @@ def main():
         st.success(f"Final score: {state.score}")
         if st.button("Play Again"):
             st.session_state.snake_state = init_game()
+            st.session_state.autopilot = Autopilot()
             st.rerun()
 
 
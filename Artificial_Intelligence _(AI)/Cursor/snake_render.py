@@ -0,0 +1,121 @@
+"""Board image for the snake app: a palette frame buffer that repaints only changed cells."""
+import io
+from itertools import islice
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from snake_rules import SnakeState
+
+CELL_SIZE_PX = 24
+# Widest board image; Streamlit scales wider images down (and encodes them again) anyway
+MAX_BOARD_WIDTH_PX = 1460
+
+# Board colors: indices into the RGB palette of the board image
+BG_LIGHT, BG_DARK, FOOD_COLOR, BODY_COLOR, HEAD_COLOR, LINE_COLOR = range(6)
+BOARD_PALETTE = [
+    (30, 30, 30),  # light square
+    (38, 38, 38),  # dark square
+    (220, 60, 60),  # food, red
+    (60, 200, 100),  # body, green
+    (250, 210, 70),  # head, yellow
+    (50, 50, 50),  # grid lines
+]
+
+
+class BoardRenderer:
+    """Keeps the board image in a frame buffer and repaints only the cells a tick changed
+
+    A tick changes at most four cells: the new head, the old head (now body), the vacated
+    tail and the food. When the state is exactly one tick (or zero) ahead of the last frame,
+    only those are repainted; after a reset, a resize or skipped ticks the whole board is.
+    The buffer holds one BOARD_PALETTE index per pixel, which makes a palette PNG several
+    times faster to encode than RGB. Cells shrink below `cell` pixels on grids too wide for
+    MAX_BOARD_WIDTH_PX.
+    """
+
+    def __init__(self, cell: int = CELL_SIZE_PX):
+        self.max_cell = cell
+        self.cell = cell
+        self.shape: Optional[Tuple[int, int]] = None
+        self.background: Optional[np.ndarray] = None  # checkerboard with grid lines
+        self.lines: Optional[np.ndarray] = None  # which pixels belong to grid lines
+        self.frame: Optional[np.ndarray] = None
+        self.state: Optional[SnakeState] = None
+        # What the frame shows: head, second segment, tail, second to last segment, length, food
+        self.drawn: Optional[tuple] = None
+        self.cells_painted = 0
+        self.full_repaints = 0
+
+    def resize(self, rows: int, cols: int):
+        cell = self.cell = max(2, min(self.max_cell, MAX_BOARD_WIDTH_PX // cols))
+        height, width = rows * cell, cols * cell
+        ys, xs = np.indices((height, width))
+        self.background = np.where((ys // cell + xs // cell) % 2 == 0, BG_LIGHT, BG_DARK).astype(np.uint8)
+        # Lines along each cell's top and left edge, and along the bottom and right edge of the board
+        self.lines = (ys % cell == 0) | (xs % cell == 0) | (ys == height - 1) | (xs == width - 1)
+        self.background[self.lines] = LINE_COLOR
+        self.shape = (rows, cols)
+
+    def paint(self, cell: Tuple[int, int], color: Optional[int]):
+        """Fill a cell with a palette color, or restore its background when color is None"""
+        r, c = cell
+        if r < 0:
+            return
+        size = self.cell
+        block = (slice(r * size, (r + 1) * size), slice(c * size, (c + 1) * size))
+        if color is None:
+            self.frame[block] = self.background[block]
+        else:
+            self.frame[block] = np.where(self.lines[block], LINE_COLOR, color)
+        self.cells_painted += 1
+
+    def repaint(self, state: SnakeState):
+        if self.shape != (state.rows, state.cols):
+            self.resize(state.rows, state.cols)
+        self.frame = self.background.copy()
+        self.paint(state.food, FOOD_COLOR)
+        for cell in islice(state.snake, 1, None):
+            self.paint(cell, BODY_COLOR)
+        self.paint(state.snake[0], HEAD_COLOR)
+        self.full_repaints += 1
+
+    def render(self, state: SnakeState) -> np.ndarray:
+        """Palette indices of the board image for this state; later calls update the array in place"""
+        snake = state.snake
+        drawn = (snake[0], snake[1], snake[-1], snake[-2], len(snake), state.food)
+        last = self.drawn
+        if last == drawn and state is self.state:
+            return self.frame
+        if last is None or state is not self.state or self.shape != (state.rows, state.cols):
+            self.repaint(state)
+        else:
+            head, _, tail, before_tail, length, food = last
+            grew = len(snake) == length + 1
+            # One move: the old head is now second, and the tail either stayed (growing) or moved on
+            if not (snake[1] == head and (snake[-1] == tail if grew else len(snake) == length
+                                          and snake[-1] == before_tail)):
+                self.repaint(state)
+            else:
+                if not grew and tail != snake[0]:
+                    self.paint(tail, None)
+                if food != state.food and food not in state.occupied:
+                    self.paint(food, None)
+                self.paint(head, BODY_COLOR)
+                self.paint(snake[0], HEAD_COLOR)
+                if food != state.food:
+                    self.paint(state.food, FOOD_COLOR)
+        self.state, self.drawn = state, drawn
+        return self.frame
+
+    def image(self, state: SnakeState) -> Image.Image:
+        image = Image.fromarray(self.render(state), mode="P")
+        image.putpalette([channel for color in BOARD_PALETTE for channel in color])
+        return image
+
+    def png(self, state: SnakeState) -> bytes:
+        """The rendered board encoded once as a palette PNG"""
+        out = io.BytesIO()
+        self.image(state).save(out, format="PNG")
+        return out.getvalue()